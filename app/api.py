@@ -5,28 +5,87 @@ This is a pure REST API backend - no web UI. Use with your Lovable frontend.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import os
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
+from . import geocode_cache, llm_cache, pricing
 from .chatbot_with_maps import MapsEnabledChatbot
+from .config import load_vertex_settings
+from .maps_models import GeocodeResponse, tool_text
 from .vertex_client import vertex_predict
 
 app = FastAPI(
     title="DeepSeek Maps + Vertex AI API",
     description="Backend API: DeepSeek LLM with Google Maps MCP tools and Vertex AI price predictions.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
-# Instantiate chatbot instance (reused across requests)
-chatbot = MapsEnabledChatbot()
+
+@functools.lru_cache(maxsize=1)
+def get_chatbot() -> MapsEnabledChatbot:
+    """
+    One chatbot (and its pooled HTTP clients) per worker, built on first use.
+    """
+
+    return MapsEnabledChatbot()
+
+
+# Vertex AI is configured at deploy time, so read its settings once at startup.
+VERTEX = load_vertex_settings()
 
 # In-memory recent predictions (in production, use a database)
-_recent_predictions: list[dict] = []
+_recent_predictions: deque[dict] = deque(maxlen=5)
+
+# In-flight /api/predict computations, keyed on the normalized request
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _trim_places(nearby: Dict[str, Any], limit: int = 5) -> list[dict]:
+    """
+    Project an MCP search_nearby result down to the fields the frontend shows.
+    Nearby context is decoration: any malformed payload yields [] (or skips
+    the bad place) rather than failing the prediction.
+    """
+    if not isinstance(nearby, dict):
+        return []
+    try:
+        data = orjson.loads(tool_text(nearby))
+    except (orjson.JSONDecodeError, AttributeError):
+        return []
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        return []
+    places = []
+    for place in results:
+        if not isinstance(place, dict):
+            continue
+        geometry = place.get("geometry")
+        places.append({
+            "name": place.get("name"),
+            "rating": place.get("rating"),
+            "vicinity": place.get("vicinity") or place.get("formatted_address"),
+            "location": geometry.get("location") if isinstance(geometry, dict) else None,
+        })
+        if len(places) == limit:
+            break
+    return places
+
+
+@app.on_event("shutdown")
+async def _close_clients() -> None:
+    if get_chatbot.cache_info().currsize:
+        await get_chatbot().aclose()
+
 
 # CORS configuration - allow your Lovable frontend
 # Set ALLOWED_ORIGINS env var for production, e.g.:
@@ -80,30 +139,37 @@ class PredictResponse(BaseModel):
     recent: list[dict]
 
 
+# Static bodies for /health and /, built once; returning them as responses
+# skips response-model validation entirely.
+_HEALTH_BODY = {"status": "ok", "service": "DeepSeek Maps + Vertex AI API"}
+_ROOT_BODY = {
+    "name": "DeepSeek Maps + Vertex AI API",
+    "version": "1.0.0",
+    "endpoints": {
+        "health": "/health",
+        "chat": "/api/chat",
+        "chat_stream": "/api/chat/stream",
+        "predict": "/api/predict",
+        "docs": "/docs",
+    },
+}
+
+
 # API Endpoints
 @app.get("/health")
-async def health() -> Dict[str, str]:
+async def health() -> ORJSONResponse:
     """Health check endpoint."""
-    return {"status": "ok", "service": "DeepSeek Maps + Vertex AI API"}
+    return ORJSONResponse(content=_HEALTH_BODY)
 
 
 @app.get("/")
-async def root() -> Dict[str, str]:
+async def root() -> ORJSONResponse:
     """API root - returns API info."""
-    return {
-        "name": "DeepSeek Maps + Vertex AI API",
-        "version": "1.0.0",
-        "endpoints": {
-            "health": "/health",
-            "chat": "/api/chat",
-            "predict": "/api/predict",
-            "docs": "/docs",
-        },
-    }
+    return ORJSONResponse(content=_ROOT_BODY)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest) -> ChatResponse:
+async def chat_endpoint(request: ChatRequest) -> ORJSONResponse:
     """
     Chat endpoint: DeepSeek LLM with optional Google Maps integration.
     
@@ -115,21 +181,89 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
     if not prompt:
         raise HTTPException(status_code=422, detail="Prompt cannot be empty.")
 
+    chatbot = get_chatbot()
+    max_tokens = int(request.max_tokens) if request.max_tokens else None
+
+    # Identical temperature-0 prompts are answered from the completion cache.
+    cache_key = None
+    if llm_cache.is_cacheable(request.temperature):
+        cache_key = llm_cache.make_key(
+            system_prompt=chatbot.system_prompt,
+            prompt=prompt,
+            use_maps=request.use_maps,
+            model="deepseek-chat",
+            temperature=request.temperature,
+            max_tokens=max_tokens,
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(
+                content={"answer": cached[0], "usage": {"cached": True}},
+                headers={"X-Cache": "HIT"},
+            )
+
     try:
-        answer, usage = chatbot.send_text(
+        answer, usage = await chatbot.asend_text(
             prompt,
             temperature=request.temperature,
-            max_tokens=int(request.max_tokens) if request.max_tokens else None,
+            max_tokens=max_tokens,
             use_maps=request.use_maps,
+            # Stateless endpoint: don't mix turns from concurrent users
+            # into one shared history.
+            keep_history=False,
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    return ChatResponse(answer=answer, usage=usage or {})
+    headers = None
+    if cache_key is not None:
+        llm_cache.put(cache_key, answer, usage or {})
+        headers = {"X-Cache": "MISS"}
+
+    # Return the plain dict directly; response_model is kept only for the docs.
+    return ORJSONResponse(content={"answer": answer, "usage": usage or {}}, headers=headers)
+
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    
+    - Same inputs as /api/chat
+    - Emits one `data: {"delta": "..."}` event per generated chunk
+    - Ends with an `event: done` event, or `event: error` if the upstream call fails
+    """
+    prompt = request.prompt.strip()
+    if not prompt:
+        raise HTTPException(status_code=422, detail="Prompt cannot be empty.")
+
+    chatbot = get_chatbot()
+    max_tokens = int(request.max_tokens) if request.max_tokens else None
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for delta in chatbot.astream_text(
+                prompt,
+                temperature=request.temperature,
+                max_tokens=max_tokens,
+                use_maps=request.use_maps,
+                keep_history=False,
+            ):
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        except Exception as exc:
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(exc)}) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/api/predict", response_model=PredictResponse)
-async def predict_endpoint(request: PredictRequest) -> PredictResponse:
+async def predict_endpoint(request: PredictRequest) -> ORJSONResponse:
     """
     Price prediction endpoint: Uses Vertex AI model (if configured) or heuristic fallback.
     
@@ -142,81 +276,93 @@ async def predict_endpoint(request: PredictRequest) -> PredictResponse:
     if not addr:
         raise HTTPException(status_code=422, detail="Address is required.")
 
-    # 1) Geocode address via MCP
-    try:
-        geo = chatbot.geocode_address(addr)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Geocoding failed: {exc}") from exc
-
-    content = geo.get("content")
-    text_blob = ""
-    if isinstance(content, list) and content:
-        text_blob = content[0].get("text", "")
-    elif isinstance(content, str):
-        text_blob = content
+    # Single-flight: identical requests already in progress share one
+    # computation (and one set of MCP/Vertex calls). The lookup and insert
+    # happen without an await in between, so no lock is needed.
+    key = geocode_cache.normalize_address(addr) + request.model_dump_json(exclude={"address"})
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_predict(request, addr))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield(): a sibling disconnecting must not cancel the shared work.
+    payload = await asyncio.shield(task)
+    return ORJSONResponse(content=payload)
+
+
+async def _predict(request: PredictRequest, addr: str) -> Dict[str, Any]:
+    """
+    Compute the /api/predict response body for a validated address.
+    """
+    chatbot = get_chatbot()
+
+    # 1) Geocode address via MCP (cached per normalized address)
+    cached = geocode_cache.get(addr)
+    geo = cached
+    if geo is None:
+        try:
+            geo = await chatbot.ageocode_address(addr)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Geocoding failed: {exc}") from exc
+
+    text_blob = tool_text(geo)
     if not text_blob:
         raise HTTPException(status_code=404, detail="No geocoding results.")
 
     try:
-        data = json.loads(text_blob)
-    except json.JSONDecodeError as exc:
+        parsed = GeocodeResponse.model_validate_json(text_blob)
+    except ValidationError as exc:
         raise HTTPException(status_code=500, detail="Bad geocode payload.") from exc
-    results = data.get("results") or []
-    if not results:
+    if not parsed.results:
         raise HTTPException(status_code=404, detail="Address not found.")
-    top = results[0]
-    normalized = top.get("formatted_address") or addr
-    geometry = top.get("geometry") or {}
-    loc = geometry.get("location") or {}
-    lat = float(loc.get("lat", 0.0))
-    lng = float(loc.get("lng", 0.0))
+    # Only cache geocodes that parsed to at least one result.
+    if cached is None:
+        geocode_cache.put(addr, geo)
+    top = parsed.results[0]
+    normalized = top.formatted_address or addr
+    lat = top.geometry.location.lat
+    lng = top.geometry.location.lng
 
     # 2) Heuristic pricing (fallback if Vertex AI not available)
-    base_psm = 280_000.0
-    type_adj = {
-        "apartment": 1.0,
-        "condo": 1.05,
-        "house": 1.15,
-        "studio": 0.95,
-    }.get((request.property_type or "apartment").lower(), 1.0)
-    size = request.sq_meters or 35.0
-    size_adj = 1.1 if size < 25 else (1.05 if size < 40 else (1.0 if size < 60 else 0.95))
-    bed_adj = 1.0 + 0.02 * (request.bedrooms or 0)
-    bath_adj = 1.0 + 0.015 * (request.bathrooms or 0)
-    age_adj = 1.0
-    if request.year_built:
-        age = max(0, 2025 - request.year_built)
-        age_adj = max(0.85, 1.0 - 0.005 * (age // 5))
-
-    psm = base_psm * type_adj * size_adj * bed_adj * bath_adj * age_adj
-    current = psm * size
-    growth = 0.05
-    monthly = {}
-    running = current
-    for m in range(1, 13):
-        seasonal = 1.0 + 0.01 * (0.5 if m in (6, 7, 8) else (-0.3 if m in (1, 2) else 0))
-        running = running * (1.0 + growth / 12) * seasonal
-        monthly[f"Month {m}"] = round(running, 0)
-    next_year = list(monthly.values())[-1] if monthly else current
-    ci = {"low": round(next_year * 0.9, 0), "high": round(next_year * 1.1, 0)}
-
-    # 3) Try Vertex AI if configured
+    estimate = pricing.heuristic_estimate(
+        request.property_type,
+        request.sq_meters,
+        request.bedrooms,
+        request.bathrooms,
+        request.year_built,
+    )
+
+    # 3) Vertex AI (if configured) and nearby context are independent once
+    # lat/lng are known, so run whichever are configured concurrently.
+    calls: Dict[str, Any] = {}
+    if VERTEX.enabled:
+        instances = [{
+            "address": normalized,
+            "district": "Zhongshan",
+            "city": "Taipei",
+            "country": "Taiwan",
+            "lat": lat,
+            "lng": lng,
+            "sq_meters": request.sq_meters or 35.0,
+            "bedrooms": request.bedrooms or 0,
+            "bathrooms": request.bathrooms or 0,
+            "property_type": request.property_type or "apartment",
+            "year_built": request.year_built or 0,
+        }]
+        calls["vertex"] = asyncio.to_thread(
+            vertex_predict, instances, parameters={"horizon_months": 12}
+        )
+    if chatbot.maps:
+        calls["nearby"] = chatbot.maps.asearch_nearby(
+            location=f"{lat},{lng}", radius=1000, keyword="mall"
+        )
+    results = dict(zip(calls, await asyncio.gather(*calls.values(), return_exceptions=True)))
+    out = results.get("vertex")
+    nearby = results.get("nearby")
+
+    # Silent fallback to heuristic if Vertex fails or returns an unexpected shape
     try:
-        if os.getenv("VERTEX_ENDPOINT_ID") or os.getenv("VERTEX_MODEL_NAME"):
-            instances = [{
-                "address": normalized,
-                "district": "Zhongshan",
-                "city": "Taipei",
-                "country": "Taiwan",
-                "lat": lat,
-                "lng": lng,
-                "sq_meters": size,
-                "bedrooms": request.bedrooms or 0,
-                "bathrooms": request.bathrooms or 0,
-                "property_type": (request.property_type or "apartment"),
-                "year_built": request.year_built or 0,
-            }]
-            out = vertex_predict(instances, parameters={"horizon_months": 12})
+        if isinstance(out, dict):
             preds = out.get("predictions") or []
             if preds:
                 p = preds[0]
@@ -224,54 +370,41 @@ async def predict_endpoint(request: PredictRequest) -> PredictResponse:
                 current_v = p.get("current_estimate_twd")
                 next_year_v = p.get("next_year_estimate_twd")
                 if isinstance(monthly_v, dict) and current_v and next_year_v:
-                    monthly = {k: float(v) for k, v in monthly_v.items()}
-                    current = float(current_v)
                     next_year = float(next_year_v)
-                    ci = {
-                        "low": float(p.get("ci90_low_twd", next_year * 0.9)),
-                        "high": float(p.get("ci90_high_twd", next_year * 1.1)),
-                    }
+                    estimate.update(
+                        monthly={k: float(v) for k, v in monthly_v.items()},
+                        current=float(current_v),
+                        next_year=next_year,
+                        ci={
+                            "low": float(p.get("ci90_low_twd", next_year * 0.9)),
+                            "high": float(p.get("ci90_high_twd", next_year * 1.1)),
+                        },
+                    )
     except Exception:
-        # Silent fallback to heuristic if Vertex fails
         pass
 
     # 4) Nearby context (optional)
     nearby_ctx = None
-    try:
-        if chatbot.maps:
-            nearby = chatbot.maps.search_nearby(location=f"{lat},{lng}", radius=1000, keyword="mall")
-            nearby_ctx = {"raw": nearby}
-    except Exception:
-        nearby_ctx = None
+    if nearby is not None and not isinstance(nearby, BaseException):
+        nearby_ctx = {"places": _trim_places(nearby)}
 
     # 5) Store in recent history
+    fields = pricing.estimate_fields(estimate)
     record = {
         "normalized_address": normalized,
-        "current_estimate_twd": round(current, 0),
-        "next_year_estimate_twd": round(next_year, 0),
+        "current_estimate_twd": fields["current_estimate_twd"],
+        "next_year_estimate_twd": fields["next_year_estimate_twd"],
     }
-    _recent_predictions.insert(0, record)
-    _recent_predictions[:] = _recent_predictions[:5]
-
-    return PredictResponse(
-        normalized_address=normalized,
-        lat=lat,
-        lng=lng,
-        monthly_forecast_twd=monthly,
-        current_estimate_twd=round(current, 0),
-        next_year_estimate_twd=round(next_year, 0),
-        ci90_twd=ci,
-        assumptions={
-            "base_psm_twd": base_psm,
-            "type_adjustment": type_adj,
-            "size_adjustment": size_adj,
-            "bedrooms": request.bedrooms,
-            "bathrooms": request.bathrooms,
-            "age_adjustment": age_adj,
-            "growth_rate_annual": growth,
-            "using_vertex_ai": bool(os.getenv("VERTEX_ENDPOINT_ID") or os.getenv("VERTEX_MODEL_NAME")),
-        },
-        nearby_context=nearby_ctx,
-        recent=_recent_predictions,
-    )
+    # appendleft is O(1), atomic, and evicts the oldest entry past maxlen.
+    _recent_predictions.appendleft(record)
 
+    payload = {
+        "normalized_address": normalized,
+        "lat": lat,
+        "lng": lng,
+        **fields,
+        "assumptions": {**estimate["assumptions"], "using_vertex_ai": VERTEX.enabled},
+        "nearby_context": nearby_ctx,
+        "recent": list(_recent_predictions),
+    }
+    return payload
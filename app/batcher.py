@@ -0,0 +1,154 @@
+"""
+Micro-batching for upstream calls that accept many inputs per request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A handler receives the unique items of one batch and returns one entry per
+# item, in order. An entry that is an exception fails only that item's callers.
+BatchHandler = Callable[[List[T]], Awaitable[Sequence[Any]]]
+
+
+class AsyncBatcher(Generic[T, R]):
+    """
+    Coalesce concurrent ``submit`` calls into batched handler calls.
+
+    Items arriving within ``flush_ms`` of the first pending item (or until
+    ``max_batch`` is reached) go upstream together. With ``key`` set, items
+    sharing a key are sent once and every caller gets the same result.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        *,
+        max_batch: int = 16,
+        flush_ms: float = 10.0,
+        key: Optional[Callable[[T], Hashable]] = None,
+    ) -> None:
+        self._handler = handler
+        self._max_batch = max_batch
+        self._flush_s = flush_ms / 1000.0
+        self._key = key
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatching: Set[asyncio.Task] = set()
+        # Every caller's future until it resolves, wherever its item is
+        # (queued, in the batch being collected, or being dispatched).
+        self._pending: Set[asyncio.Future] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Queue one item and wait for its result.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        self._ensure_worker().put_nowait((item, future))
+        return await future
+
+    async def aclose(self) -> None:
+        """
+        Stop the background worker; pending callers get a RuntimeError.
+        """
+
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._dispatching):
+            task.cancel()
+        closed = RuntimeError("AsyncBatcher closed")
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(closed)
+        self._worker = None
+        self._queue = None
+        self._loop = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        # The queue and worker belong to one event loop; rebuild them if the
+        # batcher is reused from another loop (tests, reloads).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self._flush_s
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch in the background so a slow upstream call doesn't
+            # stop the next batch from being collected.
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        items: List[T] = []
+        waiters: List[List[asyncio.Future]] = []
+        slots: Dict[Hashable, int] = {}
+        for item, future in batch:
+            if self._key is not None:
+                k = self._key(item)
+                if k in slots:
+                    waiters[slots[k]].append(future)
+                    continue
+                slots[k] = len(items)
+            items.append(item)
+            waiters.append([future])
+
+        try:
+            results = await self._handler(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as exc:
+            results = [exc] * len(items)
+
+        for result, futures in zip(results, waiters):
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -4,9 +4,9 @@ High-level chatbot wrapper built on top of the DeepSeek client.
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, AsyncIterator, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
-from .deepseek_client import DeepSeekClient, MessagePayload
+from .deepseek_client import DeepSeekClient, MessagePayload, WireMessage
 
 
 class DeepSeekChatbot:
@@ -21,15 +21,24 @@ class DeepSeekChatbot:
         client: Optional[DeepSeekClient] = None,
     ) -> None:
         self._client = client or DeepSeekClient()
-        self._history: List[MessagePayload] = []
+        # Stored in wire format so each request sends it without conversion.
+        self._history: List[WireMessage] = []
         if system_prompt:
-            self._history.append(
-                MessagePayload(role="system", content=system_prompt)
-            )
+            self._history.append({"role": "system", "content": system_prompt})
 
     @property
     def history(self) -> Sequence[MessagePayload]:
-        return tuple(self._history)
+        return tuple(
+            MessagePayload(role=message["role"], content=message["content"])
+            for message in self._history
+        )
+
+    @property
+    def system_prompt(self) -> str:
+        for message in self._history:
+            if message["role"] == "system":
+                return str(message["content"])
+        return ""
 
     def reset(self) -> None:
         """
@@ -37,7 +46,7 @@ class DeepSeekChatbot:
         """
 
         system_messages = [
-            message for message in self._history if message.role == "system"
+            message for message in self._history if message["role"] == "system"
         ]
         self._history = list(system_messages)
 
@@ -53,7 +62,7 @@ class DeepSeekChatbot:
         Send a plain text message.
         """
 
-        user_message = MessagePayload(role="user", content=text)
+        user_message: WireMessage = {"role": "user", "content": text}
         return self._send(user_message, model=model, temperature=temperature, max_tokens=max_tokens)
 
     def send_with_images(
@@ -71,12 +80,12 @@ class DeepSeekChatbot:
 
         user_message = self._client.build_multimodal_message(
             text, image_paths=image_paths
-        )
+        ).to_dict()
         return self._send(user_message, model=model, temperature=temperature, max_tokens=max_tokens)
 
     def _send(
         self,
-        message: MessagePayload,
+        message: WireMessage,
         *,
         model: str,
         temperature: Optional[float],
@@ -89,12 +98,82 @@ class DeepSeekChatbot:
             temperature=temperature,
             max_tokens=max_tokens,
         )
-        choice = response["choices"][0]
-        assistant_content = choice["message"]["content"]
-        self._history.append(
-            MessagePayload(role="assistant", content=assistant_content)
+        return self._record_reply(response)
+
+    async def asend_text(
+        self,
+        text: str,
+        *,
+        model: str = "deepseek-chat",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        keep_history: bool = True,
+    ) -> Tuple[str, dict]:
+        """
+        Async variant of :meth:`send_text`.
+
+        With ``keep_history=False`` only the system prompt and this message
+        are sent and the history is left untouched, so concurrent callers
+        sharing one chatbot (e.g. a web endpoint) can't interleave turns.
+        """
+
+        messages = self._messages({"role": "user", "content": text}, keep_history)
+        response = await self._client.achat(
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
-        usage = response.get("usage", {})
-        return str(assistant_content), usage
+        return self._record_reply(response, keep_history)
+
+    async def astream_text(
+        self,
+        text: str,
+        *,
+        model: str = "deepseek-chat",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        keep_history: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Send a plain text message and yield the reply as it streams in.
+        The full reply is added to the history once the stream completes,
+        unless ``keep_history`` is False (see :meth:`asend_text`).
+        """
 
+        messages = self._messages({"role": "user", "content": text}, keep_history)
+        parts: List[str] = []
+        async for delta in self._client.achat_stream(
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            parts.append(delta)
+            yield delta
+        if keep_history:
+            self._history.append({"role": "assistant", "content": "".join(parts)})
+
+    def _messages(self, message: WireMessage, keep_history: bool) -> List[WireMessage]:
+        if keep_history:
+            self._history.append(message)
+            return self._history
+        system = [m for m in self._history if m["role"] == "system"]
+        return system + [message]
+
+    def _record_reply(
+        self, response: Mapping[str, Any], keep_history: bool = True
+    ) -> Tuple[str, dict]:
+        choice = response["choices"][0]
+        assistant_content = str(choice["message"]["content"])
+        if keep_history:
+            self._history.append({"role": "assistant", "content": assistant_content})
+        usage = dict(response.get("usage") or {})
+        return assistant_content, usage
+
+    async def aclose(self) -> None:
+        """
+        Release pooled async connections held by the client.
+        """
 
+        await self._client.aclose()
@@ -4,15 +4,47 @@ Enhanced chatbot with Google Maps MCP integration.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import re
-from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Tuple, Union
+
+import orjson
 
 from .chatbot import DeepSeekChatbot
 from .mcp_client import MCPClient
 from .config import MCPSettings, load_mcp_settings
 
 
+def _keyword_pattern(keywords: Sequence[str]) -> re.Pattern[str]:
+    # Plain substring semantics, matching the original ``keyword in text`` checks.
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+_LOCATION_PATTERNS: Tuple[Tuple[str, re.Pattern[str]], ...] = (
+    ("search_nearby", _keyword_pattern([
+        "find", "search", "nearby", "near", "around", "places", "restaurants",
+        "hotels", "gas station", "coffee", "shopping", "what's near",
+    ])),
+    ("directions", _keyword_pattern([
+        "directions", "how to get", "route", "navigate", "way to", "drive to",
+    ])),
+    ("distance", _keyword_pattern([
+        "distance", "how far", "miles", "kilometers", "km", "away",
+    ])),
+    ("geocode", _keyword_pattern([
+        "coordinates", "latitude", "longitude", "lat lng", "where is",
+    ])),
+)
+
+# Leading filler phrases stripped from search keywords; longest first so
+# "find me" wins over "find".
+_FILLERS = (
+    "search for", "find me", "show me", "what are", "give me", "tell me",
+    "what is", "what's", "locate", "search", "find",
+)
+_FILLER_RE = re.compile("|".join(map(re.escape, _FILLERS)), re.IGNORECASE)
+
+
 class MapsEnabledChatbot(DeepSeekChatbot):
     """
     Chatbot with Google Maps functionality via MCP.
@@ -58,32 +90,11 @@ class MapsEnabledChatbot(DeepSeekChatbot):
         Simple heuristic to detect location-related queries.
         Returns a dict with query type and parameters if detected.
         """
-        text_lower = text.lower()
-        
-        # Search nearby places
-        if any(keyword in text_lower for keyword in [
-            "find", "search", "nearby", "near", "around", "places", "restaurants",
-            "hotels", "gas station", "coffee", "shopping", "what's near"
-        ]):
-            return {"type": "search_nearby", "query": text}
-        
-        # Directions
-        if any(keyword in text_lower for keyword in [
-            "directions", "how to get", "route", "navigate", "way to", "drive to"
-        ]):
-            return {"type": "directions", "query": text}
-        
-        # Distance
-        if any(keyword in text_lower for keyword in [
-            "distance", "how far", "miles", "kilometers", "km", "away"
-        ]):
-            return {"type": "distance", "query": text}
-        
-        # Geocoding
-        if any(keyword in text_lower for keyword in [
-            "coordinates", "latitude", "longitude", "lat lng", "where is"
-        ]):
-            return {"type": "geocode", "query": text}
+        # Categories are checked in priority order (search, directions,
+        # distance, geocode), one precompiled scan each.
+        for query_type, pattern in _LOCATION_PATTERNS:
+            if pattern.search(text):
+                return {"type": query_type, "query": text}
         
         return None
 
@@ -121,24 +132,10 @@ class MapsEnabledChatbot(DeepSeekChatbot):
         if not text:
             return None
 
-        lowered = text.lower()
-        fillers = [
-            "find me",
-            "find",
-            "show me",
-            "search for",
-            "search",
-            "locate",
-            "what is",
-            "what's",
-            "what are",
-            "give me",
-            "tell me",
-        ]
-        for filler in fillers:
-            if lowered.startswith(filler):
-                trimmed = text[len(filler) :].strip(" ,.:;-")
-                return trimmed or None
+        match = _FILLER_RE.match(text)
+        if match:
+            trimmed = text[match.end() :].strip(" ,.:;-")
+            return trimmed or None
         return text
 
     def _geocode_location(self, location: str) -> Optional[Tuple[float, float]]:
@@ -168,8 +165,8 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             return None
 
         try:
-            data = json.loads(text_blob)
-        except json.JSONDecodeError:
+            data = orjson.loads(text_blob)
+        except orjson.JSONDecodeError:
             return None
 
         results = data.get("results") or []
@@ -238,7 +235,7 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             if isinstance(content, list) and len(content) > 0:
                 text_content = content[0].get("text", "")
                 try:
-                    data = json.loads(text_content)
+                    data = orjson.loads(text_content)
                     places = data.get("results", [])
                     if not places:
                         return "No places found."
@@ -252,12 +249,12 @@ class MapsEnabledChatbot(DeepSeekChatbot):
                         formatted += f"   Rating: {rating}/5\n"
                         formatted += f"   Address: {address}\n\n"
                     return formatted
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     return text_content
             elif isinstance(content, str):
                 return content
         
-        return json.dumps(result, indent=2)
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
 
     def send_text(
         self,
@@ -287,13 +284,7 @@ class MapsEnabledChatbot(DeepSeekChatbot):
                     location_query["query"]
                 )
                 # Include maps result in the prompt
-                enhanced_text = f"{text}\n\n[Google Maps Result]:\n{maps_result}"
-                return super().send_text(
-                    enhanced_text,
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
+                text = f"{text}\n\n[Google Maps Result]:\n{maps_result}"
         
         return super().send_text(
             text,
@@ -302,6 +293,71 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             max_tokens=max_tokens,
         )
 
+    async def asend_text(
+        self,
+        text: str,
+        *,
+        model: str = "deepseek-chat",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_maps: Optional[bool] = None,
+        keep_history: bool = True,
+    ) -> Tuple[str, dict]:
+        """
+        Async variant of :meth:`send_text`.
+        """
+        text = await self._aenhance_with_maps(text, use_maps)
+        return await super().asend_text(
+            text,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            keep_history=keep_history,
+        )
+
+    async def astream_text(
+        self,
+        text: str,
+        *,
+        model: str = "deepseek-chat",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_maps: Optional[bool] = None,
+        keep_history: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of :meth:`asend_text`, yielding reply deltas.
+        """
+        text = await self._aenhance_with_maps(text, use_maps)
+        async for delta in super().astream_text(
+            text,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            keep_history=keep_history,
+        ):
+            yield delta
+
+    async def _aenhance_with_maps(self, text: str, use_maps: Optional[bool]) -> str:
+        """
+        Append the Google Maps result to the prompt for location queries.
+        The MCP lookup still uses the sync client, so it runs in a worker thread.
+        """
+        use_maps = use_maps if use_maps is not None else self._enable_maps
+        if not use_maps:
+            return text
+
+        location_query = self._extract_location_query(text)
+        if not location_query:
+            return text
+
+        maps_result = await asyncio.to_thread(
+            self._call_maps_tool,
+            location_query["type"],
+            location_query["query"],
+        )
+        return f"{text}\n\n[Google Maps Result]:\n{maps_result}"
+
     # Expose MCP client methods for direct access
     @property
     def maps(self) -> Optional[MCPClient]:
@@ -325,6 +381,23 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             **kwargs,
         )
 
+    async def asearch_nearby_places(
+        self,
+        location: str,
+        radius: Optional[int] = None,
+        keyword: Optional[str] = None,
+        **kwargs,
+    ) -> dict:
+        """Async variant of :meth:`search_nearby_places`."""
+        if not self._mcp_client:
+            raise RuntimeError("MCP client not available")
+        return await self._mcp_client.asearch_nearby(
+            location=location,
+            radius=radius,
+            keyword=keyword,
+            **kwargs,
+        )
+
     def get_directions(
         self,
         origin: str,
@@ -340,6 +413,21 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             mode=mode,
         )
 
+    async def aget_directions(
+        self,
+        origin: str,
+        destination: str,
+        mode: str = "driving",
+    ) -> dict:
+        """Async variant of :meth:`get_directions`."""
+        if not self._mcp_client:
+            raise RuntimeError("MCP client not available")
+        return await self._mcp_client.adirections(
+            origin=origin,
+            destination=destination,
+            mode=mode,
+        )
+
     def get_distance(
         self,
         origins: List[str],
@@ -355,9 +443,36 @@ class MapsEnabledChatbot(DeepSeekChatbot):
             mode=mode,
         )
 
+    async def aget_distance(
+        self,
+        origins: List[str],
+        destinations: List[str],
+        mode: str = "driving",
+    ) -> dict:
+        """Async variant of :meth:`get_distance`."""
+        if not self._mcp_client:
+            raise RuntimeError("MCP client not available")
+        return await self._mcp_client.adistance_matrix(
+            origins=origins,
+            destinations=destinations,
+            mode=mode,
+        )
+
     def geocode_address(self, address: str) -> dict:
         """Convert address to coordinates."""
         if not self._mcp_client:
             raise RuntimeError("MCP client not available")
         return self._mcp_client.geocode(address)
 
+    async def ageocode_address(self, address: str) -> dict:
+        """Async variant of :meth:`geocode_address`."""
+        if not self._mcp_client:
+            raise RuntimeError("MCP client not available")
+        return await self._mcp_client.ageocode(address)
+
+    async def aclose(self) -> None:
+        """Release pooled async connections for DeepSeek and MCP."""
+        await super().aclose()
+        if self._mcp_client:
+            await self._mcp_client.aclose()
+
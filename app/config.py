@@ -8,6 +8,11 @@ import os
 from dataclasses import dataclass
 
 
+# How long stable Google Maps lookups (geocodes, place details) are reused,
+# both by the MCP client and by the apps' geocode cache.
+MAPS_LOOKUP_TTL_SECONDS = 24 * 60 * 60
+
+
 class MissingAPIKeyError(RuntimeError):
     """Raised when the DeepSeek API key is missing."""
 
@@ -41,6 +46,20 @@ class MCPSettings:
         return f"{self.url.rstrip('/')}/mcp"
 
 
+@dataclass(frozen=True)
+class VertexSettings:
+    """
+    Holds the Vertex AI model target used for price predictions.
+    """
+
+    endpoint_id: str | None = None
+    model_name: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.endpoint_id or self.model_name)
+
+
 def load_settings() -> DeepSeekSettings:
     """
     Load settings from the environment.
@@ -66,3 +85,11 @@ def load_mcp_settings() -> MCPSettings:
     return MCPSettings(url=url, api_key=api_key)
 
 
+def load_vertex_settings() -> VertexSettings:
+    """
+    Load Vertex AI settings from the environment.
+    Both values are optional; without them the heuristic pricing is used.
+    """
+    endpoint_id = os.getenv("VERTEX_ENDPOINT_ID")
+    model_name = os.getenv("VERTEX_MODEL_NAME")
+    return VertexSettings(endpoint_id=endpoint_id, model_name=model_name)
@@ -5,11 +5,25 @@ Thin client around the DeepSeek REST API.
 from __future__ import annotations
 
 import base64
+import functools
 import mimetypes
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Literal, Mapping, MutableMapping, Optional, Sequence, Union
-
+from typing import (
+    AsyncIterator,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    TypedDict,
+    Union,
+)
+
+import httpx
+import orjson
 import requests
 
 from .config import DeepSeekSettings, load_settings
@@ -17,11 +31,44 @@ from .config import DeepSeekSettings, load_settings
 Role = Literal["system", "user", "assistant"]
 
 
+class WireMessage(TypedDict):
+    """
+    A message as sent on the wire: {"role": ..., "content": ...}
+    """
+
+    role: Role
+    content: Union[str, Sequence[Mapping[str, str]]]
+
+
+# Pool sizing for the async client; keeps TLS connections to DeepSeek warm.
+_ASYNC_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30,
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_image(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Base64-encode an image file, memoized on (path, mtime, size).
+    """
+
+    return base64.b64encode(Path(path).read_bytes()).decode("utf-8")
+
+
 @dataclass
 class MessagePayload:
     role: Role
     content: Union[str, Sequence[Mapping[str, str]]]
 
+    def to_dict(self) -> WireMessage:
+        """
+        Convert to the API wire format used for conversation history.
+        """
+
+        return {"role": self.role, "content": self.content}
+
 
 class DeepSeekClient:
     """
@@ -32,9 +79,26 @@ class DeepSeekClient:
         self,
         settings: Optional[DeepSeekSettings] = None,
         session: Optional[requests.Session] = None,
+        async_client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self._settings = settings or load_settings()
         self._session = session or requests.Session()
+        self._async_client = async_client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Built lazily so the CLI (sync only) never opens an async pool.
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(http2=True, limits=_ASYNC_LIMITS)
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Close the async HTTP client, if one was created.
+        """
+
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
 
     def _headers(self) -> MutableMapping[str, str]:
         return {
@@ -47,8 +111,9 @@ class DeepSeekClient:
         mime_type, _ = mimetypes.guess_type(image_path)
         if mime_type is None:
             raise ValueError(f"Could not infer MIME type for {image_path}")
-        data = image_path.read_bytes()
-        encoded = base64.b64encode(data).decode("utf-8")
+        # mtime/size in the key so an edited file is re-read.
+        stat = image_path.stat()
+        encoded = _encode_image(str(image_path), stat.st_mtime_ns, stat.st_size)
         return {"type": "image_base64", "mime": mime_type, "data": encoded}
 
     def build_multimodal_message(
@@ -67,9 +132,29 @@ class DeepSeekClient:
                 parts.append(self._image_to_part(path))
         return MessagePayload(role="user", content=parts)
 
+    @staticmethod
+    def _build_payload(
+        messages: Sequence[WireMessage],
+        *,
+        model: str,
+        stream: bool,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> MutableMapping[str, object]:
+        payload: MutableMapping[str, object] = {
+            "model": model,
+            "messages": list(messages),
+            "stream": stream,
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        return payload
+
     def chat(
         self,
-        messages: Sequence[MessagePayload],
+        messages: Sequence[WireMessage],
         *,
         model: str = "deepseek-chat",
         stream: bool = False,
@@ -80,26 +165,90 @@ class DeepSeekClient:
         Send a chat completion request, returning parsed JSON.
         """
 
-        payload: MutableMapping[str, object] = {
-            "model": model,
-            "messages": [
-                {"role": message.role, "content": message.content}
-                for message in messages
-            ],
-            "stream": stream,
-        }
-        if temperature is not None:
-            payload["temperature"] = temperature
-        if max_tokens is not None:
-            payload["max_tokens"] = max_tokens
-
+        payload = self._build_payload(
+            messages,
+            model=model,
+            stream=stream,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
         response = self._session.post(
             self._settings.endpoint,
             headers=self._headers(),
-            json=payload,
+            data=orjson.dumps(payload),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def achat(
+        self,
+        messages: Sequence[WireMessage],
+        *,
+        model: str = "deepseek-chat",
+        stream: bool = False,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Mapping[str, object]:
+        """
+        Async variant of :meth:`chat` using a pooled ``httpx.AsyncClient``.
+        """
+
+        payload = self._build_payload(
+            messages,
+            model=model,
+            stream=stream,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        response = await self._get_async_client().post(
+            self._settings.endpoint,
+            headers=self._headers(),
+            content=orjson.dumps(payload),
             timeout=60,
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
 
+    async def achat_stream(
+        self,
+        messages: Sequence[WireMessage],
+        *,
+        model: str = "deepseek-chat",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        """
 
+        payload = self._build_payload(
+            messages,
+            model=model,
+            stream=True,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        async with self._get_async_client().stream(
+            "POST",
+            self._settings.endpoint,
+            headers=self._headers(),
+            content=orjson.dumps(payload),
+            timeout=60,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Server-sent events: only "data:" lines carry chunks.
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = orjson.loads(data)
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                content = delta.get("content")
+                if content:
+                    yield content
@@ -0,0 +1,52 @@
+"""
+In-process TTL cache for Google Maps geocoding results.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from .config import MAPS_LOOKUP_TTL_SECONDS
+from .mcp_client import normalize_address
+
+# Geocodes for a street address are stable; a day keeps the cache fresh
+# without re-billing the Maps API for every repeated lookup.
+GEOCODE_TTL_SECONDS = MAPS_LOOKUP_TTL_SECONDS
+
+_cache: TTLCache = TTLCache(maxsize=4096, ttl=GEOCODE_TTL_SECONDS)
+_lock = threading.Lock()
+
+
+def get(address: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached MCP geocode result for an address, if still fresh.
+    """
+
+    key = normalize_address(address)
+    with _lock:
+        return _cache.get(key)
+
+
+def put(address: str, result: Dict[str, Any]) -> None:
+    """
+    Store an MCP geocode result. Empty responses and tool errors (e.g.
+    OVER_QUERY_LIMIT) are transient and not cached.
+    """
+
+    if not result or not result.get("content") or result.get("isError"):
+        return
+    key = normalize_address(address)
+    with _lock:
+        _cache[key] = result
+
+
+def clear() -> None:
+    """
+    Drop every cached geocode result.
+    """
+
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,72 @@
+"""
+In-process TTL cache for deterministic DeepSeek chat completions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+LLM_CACHE_TTL_SECONDS = 60 * 60
+
+_cache: TTLCache = TTLCache(maxsize=2048, ttl=LLM_CACHE_TTL_SECONDS)
+_lock = threading.Lock()
+
+
+def is_cacheable(temperature: Optional[float]) -> bool:
+    """
+    Only requests that explicitly ask for temperature 0 are reused. An unset
+    temperature is omitted from the request and DeepSeek samples at its
+    default (1.0), so those answers are not deterministic.
+    """
+
+    return temperature is not None and temperature == 0
+
+
+def make_key(
+    *,
+    system_prompt: str,
+    prompt: str,
+    use_maps: bool,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+) -> str:
+    """
+    Hash everything that influences the completion into a fixed-size key.
+    The API sends chat turns without history (system prompt + prompt), so
+    these fields are the whole input.
+    """
+
+    parts = (system_prompt, prompt, str(use_maps), model, str(temperature), str(max_tokens))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[Tuple[str, dict]]:
+    """
+    Return a cached ``(answer, usage)`` pair, if still fresh.
+    """
+
+    with _lock:
+        return _cache.get(key)
+
+
+def put(key: str, answer: str, usage: dict) -> None:
+    """
+    Store a completion under the given key.
+    """
+
+    with _lock:
+        _cache[key] = (answer, usage)
+
+
+def clear() -> None:
+    """
+    Drop every cached completion.
+    """
+
+    with _lock:
+        _cache.clear()
@@ -5,14 +5,15 @@ Example CLI for interacting with the DeepSeek chatbot.
 from __future__ import annotations
 
 import argparse
-import json
-from pathlib import Path
+import sys
 from typing import List, Optional
 
+import orjson
+
 from .chatbot import DeepSeekChatbot
 
 
-def parse_args() -> argparse.Namespace:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Chat with the DeepSeek multimodal model."
     )
@@ -49,7 +50,14 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Pretty-print the raw API response metadata.",
     )
-    return parser.parse_args()
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def parse_args() -> argparse.Namespace:
+    return _PARSER.parse_args()
 
 
 def main() -> None:
@@ -59,7 +67,7 @@ def main() -> None:
     if args.images:
         response, usage = chatbot.send_with_images(
             args.prompt,
-            image_paths=[Path(img) for img in args.images],
+            image_paths=args.images,
             model=args.model,
             temperature=args.temperature,
             max_tokens=args.max_tokens,
@@ -75,7 +83,10 @@ def main() -> None:
     print(response)
     if args.pretty and usage:
         print("\n--- Usage ---")
-        print(json.dumps(usage, indent=2))
+        # Flush the text layer first so the raw bytes land after the header.
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(usage, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
 
 
 if __name__ == "__main__":
@@ -5,46 +5,75 @@ Example usage of the Maps-enabled chatbot.
 from __future__ import annotations
 
 from .chatbot_with_maps import MapsEnabledChatbot
+from .mcp_client import MCPClient
+
+# Examples 1, 2 and 4 don't depend on each other, so they go out as one
+# JSON-RPC batch: a single HTTP round trip instead of three.
+_LOOKUPS = (
+    (
+        "search_nearby",
+        {"location": "San Francisco, CA", "keyword": "coffee", "radius": 2000},
+    ),
+    (
+        "maps_directions",
+        {
+            "origin": "San Francisco, CA",
+            "destination": "Los Angeles, CA",
+            "mode": "driving",
+        },
+    ),
+    ("maps_geocode", {"address": "1600 Amphitheatre Parkway, Mountain View, CA"}),
+)
+
+
+def _run_lookups(chatbot: MapsEnabledChatbot) -> list:
+    """Run the independent lookups in one batch; failures come back as exceptions."""
+    maps = chatbot.maps
+    if maps is None:
+        return [RuntimeError("MCP client not available")] * len(_LOOKUPS)
+    try:
+        return maps.call_tools_batch(_LOOKUPS)
+    except Exception:
+        # The server rejected the batch as a whole (e.g. no JSON-RPC batch
+        # support): fall back to one call per lookup.
+        return [_call_one(maps, name, arguments) for name, arguments in _LOOKUPS]
+
+
+def _call_one(maps: MCPClient, name: str, arguments: dict) -> object:
+    try:
+        return maps.call_tool(name, arguments)
+    except Exception as exc:
+        return exc
+
+
+def _print_result(label: str, result: object) -> None:
+    if isinstance(result, BaseException):
+        print(f"Error: {result}")
+    else:
+        print(f"{label}:", result)
+    print()
 
 
 def main() -> None:
     """Example of using Google Maps with the chatbot."""
-    
+
     # Initialize the maps-enabled chatbot
     chatbot = MapsEnabledChatbot()
-    
+
     print("Maps-Enabled Chatbot Example")
     print("=" * 50)
     print()
-    
+
+    results, directions, geocode_result = _run_lookups(chatbot)
+
     # Example 1: Search for nearby places
     print("Example 1: Searching for nearby coffee shops...")
-    try:
-        result = chatbot.search_nearby_places(
-            location="San Francisco, CA",
-            keyword="coffee",
-            radius=2000,
-        )
-        print("Results:", result)
-        print()
-    except Exception as e:
-        print(f"Error: {e}")
-        print()
-    
+    _print_result("Results", results)
+
     # Example 2: Get directions
     print("Example 2: Getting directions...")
-    try:
-        directions = chatbot.get_directions(
-            origin="San Francisco, CA",
-            destination="Los Angeles, CA",
-            mode="driving",
-        )
-        print("Directions:", directions)
-        print()
-    except Exception as e:
-        print(f"Error: {e}")
-        print()
-    
+    _print_result("Directions", directions)
+
     # Example 3: Chat with automatic maps integration
     print("Example 3: Chat with automatic maps detection...")
     response, usage = chatbot.send_text(
@@ -53,18 +82,11 @@ def main() -> None:
     )
     print("Response:", response)
     print()
-    
+
     # Example 4: Geocode an address
     print("Example 4: Geocoding an address...")
-    try:
-        geocode_result = chatbot.geocode_address("1600 Amphitheatre Parkway, Mountain View, CA")
-        print("Geocode result:", geocode_result)
-        print()
-    except Exception as e:
-        print(f"Error: {e}")
-        print()
+    _print_result("Geocode result", geocode_result)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,42 @@
+"""
+Typed views of Google Maps MCP tool payloads shared by the API and web UI.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+def tool_text(result: Dict[str, Any]) -> str:
+    """
+    Return the text payload of an MCP tool result ("" if there is none).
+    """
+
+    content = result.get("content")
+    if isinstance(content, list) and content:
+        return content[0].get("text", "")
+    if isinstance(content, str):
+        return content
+    return ""
+
+
+# Geocode payload (only the fields we read). Parsed straight from the JSON
+# text by pydantic-core, without an intermediate dict.
+class GeocodeLocation(BaseModel):
+    lat: float = 0.0
+    lng: float = 0.0
+
+
+class GeocodeGeometry(BaseModel):
+    location: GeocodeLocation = GeocodeLocation()
+
+
+class GeocodeResult(BaseModel):
+    formatted_address: Optional[str] = None
+    geometry: GeocodeGeometry = GeocodeGeometry()
+
+
+class GeocodeResponse(BaseModel):
+    results: list[GeocodeResult] = []
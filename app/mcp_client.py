@@ -5,13 +5,82 @@ Communicates with the mcp-google-map HTTP server.
 
 from __future__ import annotations
 
-import json
-import uuid
-from typing import Any, Dict, List, Optional, Mapping, Tuple
+import asyncio
+import itertools
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Mapping, Sequence, Tuple, Union
 
+import httpx
+import orjson
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
-from .config import MCPSettings, load_mcp_settings
+from .config import MAPS_LOOKUP_TTL_SECONDS, MCPSettings, load_mcp_settings
+from .maps_models import tool_text
+
+
+def _build_default_session() -> requests.Session:
+    """
+    Shared, pool-tuned session so every sync MCPClient reuses connections.
+    MCP tool calls are read-only, so retrying POST on gateway errors is safe.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_DEFAULT_SESSION = _build_default_session()
+
+# Pool sizing for the async client; all MCP tool calls share these
+# keep-alive connections instead of reconnecting per request.
+_ASYNC_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30,
+)
+
+# The Elevation API accepts at most 512 locations per request; stay under it.
+ELEVATION_BATCH_SIZE = 500
+
+# Geocode / reverse-geocode / place-details answers are pure functions of
+# their arguments, so they are shared process-wide. Keys include the server
+# URL, so clients pointed at different MCP servers never see each other's
+# results.
+LOOKUP_TTL_SECONDS = MAPS_LOOKUP_TTL_SECONDS
+
+# The JSON-RPC envelope is stitched from bytes so only ``params`` goes
+# through the encoder.
+_ENVELOPE_PREFIX = b'{"jsonrpc":"2.0","id":'
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+_lookup_cache: TTLCache = TTLCache(maxsize=1024, ttl=LOOKUP_TTL_SECONDS)
+_lookup_lock = threading.Lock()
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical cache key for an address: lowercased, whitespace collapsed.
+    """
+
+    return " ".join(address.lower().split())
+
+
+def clear_lookup_cache() -> None:
+    """Drop every cached geocode / place-details result."""
+    with _lookup_lock:
+        _lookup_cache.clear()
 
 
 class MCPClient:
@@ -23,15 +92,36 @@ class MCPClient:
         self,
         settings: Optional[MCPSettings] = None,
         session: Optional[requests.Session] = None,
+        async_client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self._settings = settings or load_mcp_settings()
-        self._session = session or requests.Session()
-        self._session_id = str(uuid.uuid4())
+        self._session = session or _DEFAULT_SESSION
+        self._async_client = async_client
+        self._ids = itertools.count(1)
+        # Settings are fixed for the client's lifetime; build these once.
+        self._url = self._settings.endpoint
+        self._headers = self._build_headers()
 
-    def _headers(self) -> Dict[str, str]:
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Built lazily on the first async call.
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(limits=_ASYNC_LIMITS)
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client, if one was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _build_headers(self) -> Dict[str, str]:
         """Get headers for MCP requests."""
         headers = {
             "Content-Type": "application/json",
+            # Tool results are repetitive JSON and compress well. urllib3's
+            # list only includes br when brotli is installed, so the sync and
+            # async clients can always decode what they advertise.
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
         if self._settings.api_key:
             headers["X-Google-Maps-API-Key"] = self._settings.api_key
@@ -50,24 +140,59 @@ class MCPClient:
         Returns:
             The JSON response from the server
         """
-        url = f"{self._settings.url.rstrip('/')}/mcp"
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-        }
-        if params:
-            payload["params"] = params
+        return self._unwrap(self._post(self._encode_request(method, params)))
 
-        response = self._session.post(
-            url,
-            headers=self._headers(),
-            json=payload,
+    async def _amake_request(
+        self, method: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`_make_request` on the pooled client."""
+        return self._unwrap(await self._apost(self._encode_request(method, params)))
+
+    def _post(self, body: bytes) -> Any:
+        """POST an encoded JSON-RPC body and decode the reply."""
+        # Stream the body into one buffer: large tool results (nearby
+        # searches, distance matrices) skip requests' chunk list + join.
+        with self._session.post(
+            self._url,
+            headers=self._headers,
+            data=body,
+            timeout=30,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            buf = bytearray()
+            for chunk in response.iter_content(chunk_size=_READ_CHUNK_SIZE):
+                buf += chunk
+        return orjson.loads(buf)
+
+    async def _apost(self, body: bytes) -> Any:
+        """Async variant of :meth:`_post`."""
+        response = await self._get_async_client().post(
+            self._url,
+            headers=self._headers,
+            content=body,
             timeout=30,
         )
         response.raise_for_status()
-        result = response.json()
-        
+        return orjson.loads(response.content)
+
+    def _encode_request(self, method: str, params: Optional[Dict[str, Any]]) -> bytes:
+        """Encode a JSON-RPC request with a fresh per-client id."""
+        head = b"".join(
+            (
+                _ENVELOPE_PREFIX,
+                str(next(self._ids)).encode(),
+                b',"method":',
+                orjson.dumps(method),
+            )
+        )
+        if params:
+            return head + b',"params":' + orjson.dumps(params) + b"}"
+        return head + b"}"
+
+    @staticmethod
+    def _unwrap(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the JSON-RPC result, raising on server errors."""
         if "error" in result:
             raise RuntimeError(f"MCP Error: {result['error']}")
         
@@ -78,6 +203,11 @@ class MCPClient:
         result = self._make_request("tools/list")
         return result.get("tools", [])
 
+    async def alist_tools(self) -> List[Dict[str, Any]]:
+        """Async variant of :meth:`list_tools`."""
+        result = await self._amake_request("tools/list")
+        return result.get("tools", [])
+
     def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Call a tool on the MCP server.
@@ -95,6 +225,114 @@ class MCPClient:
         )
         return result
 
+    async def acall_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of :meth:`call_tool`."""
+        return await self._amake_request(
+            "tools/call",
+            params={"name": name, "arguments": arguments},
+        )
+
+    def call_tools_batch(
+        self, calls: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> List[Union[Dict[str, Any], RuntimeError]]:
+        """
+        Call several tools in one JSON-RPC batch (a single HTTP round trip).
+        
+        Args:
+            calls: ``(name, arguments)`` pairs
+            
+        Returns:
+            One entry per call, in order: the tool's response, or the
+            ``RuntimeError`` for calls the server answered with an error
+        """
+        if not calls:
+            return []
+        body, ids = self._encode_batch(calls)
+        return self._demux_batch(self._post(body), ids)
+
+    async def acall_tools_batch(
+        self, calls: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> List[Union[Dict[str, Any], RuntimeError]]:
+        """Async variant of :meth:`call_tools_batch`."""
+        if not calls:
+            return []
+        body, ids = self._encode_batch(calls)
+        return self._demux_batch(await self._apost(body), ids)
+
+    def _encode_batch(
+        self, calls: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> Tuple[bytes, List[int]]:
+        ids = [next(self._ids) for _ in calls]
+        parts = (
+            b"".join(
+                (
+                    _ENVELOPE_PREFIX,
+                    str(request_id).encode(),
+                    b',"method":"tools/call","params":',
+                    orjson.dumps({"name": name, "arguments": arguments}),
+                    b"}",
+                )
+            )
+            for request_id, (name, arguments) in zip(ids, calls)
+        )
+        return b"[" + b",".join(parts) + b"]", ids
+
+    @staticmethod
+    def _demux_batch(
+        replies: Any, ids: List[int]
+    ) -> List[Union[Dict[str, Any], RuntimeError]]:
+        # A malformed batch is answered with a single error object.
+        if not isinstance(replies, list):
+            MCPClient._unwrap(replies)
+            raise RuntimeError(f"MCP Error: unexpected batch reply {replies!r}")
+        by_id = {reply.get("id"): reply for reply in replies}
+        results: List[Union[Dict[str, Any], RuntimeError]] = []
+        for request_id in ids:
+            reply = by_id.get(request_id)
+            if reply is None:
+                results.append(RuntimeError(f"MCP Error: no reply for id {request_id}"))
+                continue
+            try:
+                results.append(MCPClient._unwrap(reply))
+            except RuntimeError as exc:
+                results.append(exc)
+        return results
+
+    def _cached_call(
+        self, name: str, arguments: Dict[str, Any], key: Tuple[Any, ...]
+    ) -> Dict[str, Any]:
+        """Call a lookup tool through the shared TTL cache."""
+        cache_key = (self._url, name, key)
+        with _lookup_lock:
+            cached = _lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        result = self.call_tool(name, arguments)
+        self._store_lookup(cache_key, result)
+        return result
+
+    async def _acached_call(
+        self, name: str, arguments: Dict[str, Any], key: Tuple[Any, ...]
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`_cached_call`."""
+        cache_key = (self._url, name, key)
+        with _lookup_lock:
+            cached = _lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        result = await self.acall_tool(name, arguments)
+        self._store_lookup(cache_key, result)
+        return result
+
+    @staticmethod
+    def _store_lookup(cache_key: Tuple[Any, ...], result: Dict[str, Any]) -> None:
+        # Empty answers and tool errors are usually transient upstream
+        # failures; don't pin them.
+        if not result or not result.get("content") or result.get("isError"):
+            return
+        with _lookup_lock:
+            _lookup_cache[cache_key] = result
+
     # Convenience methods for Google Maps tools
 
     def search_nearby(
@@ -120,19 +358,48 @@ class MCPClient:
         Returns:
             Search results
         """
-        args: Dict[str, Any] = {"location": location}
-        if radius is not None:
-            args["radius"] = radius
-        if keyword:
-            args["keyword"] = keyword
-        if min_rating is not None:
-            args["minRating"] = min_rating
-        if open_now is not None:
-            args["openNow"] = open_now
-        if type:
-            args["type"] = type
+        return self.call_tool(
+            "search_nearby",
+            self._nearby_args(location, radius, keyword, min_rating, open_now, type),
+        )
 
-        return self.call_tool("search_nearby", args)
+    async def asearch_nearby(
+        self,
+        location: str,
+        radius: Optional[int] = None,
+        keyword: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        open_now: Optional[bool] = None,
+        type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`search_nearby`."""
+        return await self.acall_tool(
+            "search_nearby",
+            self._nearby_args(location, radius, keyword, min_rating, open_now, type),
+        )
+
+    @staticmethod
+    def _nearby_args(
+        location: str,
+        radius: Optional[int],
+        keyword: Optional[str],
+        min_rating: Optional[float],
+        open_now: Optional[bool],
+        type: Optional[str],
+    ) -> Dict[str, Any]:
+        # Empty keyword/type strings are dropped just like unset filters.
+        return {
+            key: value
+            for key, value in (
+                ("location", location),
+                ("radius", radius),
+                ("keyword", keyword or None),
+                ("minRating", min_rating),
+                ("openNow", open_now),
+                ("type", type or None),
+            )
+            if value is not None
+        }
 
     def get_place_details(self, place_id: str) -> Dict[str, Any]:
         """
@@ -144,7 +411,15 @@ class MCPClient:
         Returns:
             Place details
         """
-        return self.call_tool("get_place_details", {"placeId": place_id})
+        return self._cached_call(
+            "get_place_details", {"placeId": place_id}, (place_id,)
+        )
+
+    async def aget_place_details(self, place_id: str) -> Dict[str, Any]:
+        """Async variant of :meth:`get_place_details`."""
+        return await self._acached_call(
+            "get_place_details", {"placeId": place_id}, (place_id,)
+        )
 
     def geocode(self, address: str) -> Dict[str, Any]:
         """
@@ -156,7 +431,15 @@ class MCPClient:
         Returns:
             Geocoding results with coordinates
         """
-        return self.call_tool("maps_geocode", {"address": address})
+        return self._cached_call(
+            "maps_geocode", {"address": address}, (normalize_address(address),)
+        )
+
+    async def ageocode(self, address: str) -> Dict[str, Any]:
+        """Async variant of :meth:`geocode`."""
+        return await self._acached_call(
+            "maps_geocode", {"address": address}, (normalize_address(address),)
+        )
 
     def reverse_geocode(self, lat: float, lng: float) -> Dict[str, Any]:
         """
@@ -169,13 +452,22 @@ class MCPClient:
         Returns:
             Reverse geocoding results with address
         """
-        return self.call_tool("maps_reverse_geocode", {"lat": lat, "lng": lng})
+        return self._cached_call(
+            "maps_reverse_geocode", {"lat": lat, "lng": lng}, (lat, lng)
+        )
+
+    async def areverse_geocode(self, lat: float, lng: float) -> Dict[str, Any]:
+        """Async variant of :meth:`reverse_geocode`."""
+        return await self._acached_call(
+            "maps_reverse_geocode", {"lat": lat, "lng": lng}, (lat, lng)
+        )
 
     def distance_matrix(
         self,
         origins: List[str],
         destinations: List[str],
         mode: str = "driving",
+        compact: bool = False,
     ) -> Dict[str, Any]:
         """
         Calculate distances and travel times.
@@ -184,19 +476,73 @@ class MCPClient:
             origins: List of origin locations
             destinations: List of destination locations
             mode: Travel mode (driving, walking, bicycling, transit)
+            compact: Send origins/destinations as ``|``-joined strings (the
+                Google Maps REST form) for smaller payloads on large N x M
+                queries. Falls back to lists if the server rejects them
+                (an MCP error or an ``isError`` tool result).
             
         Returns:
             Distance matrix results
         """
+        if compact:
+            try:
+                result = self.call_tool(
+                    "maps_distance_matrix",
+                    self._matrix_args(origins, destinations, mode, compact=True),
+                )
+            except RuntimeError:
+                pass
+            else:
+                if not result.get("isError"):
+                    return result
         return self.call_tool(
             "maps_distance_matrix",
-            {
-                "origins": origins,
-                "destinations": destinations,
-                "mode": mode,
-            },
+            self._matrix_args(origins, destinations, mode),
+        )
+
+    async def adistance_matrix(
+        self,
+        origins: List[str],
+        destinations: List[str],
+        mode: str = "driving",
+        compact: bool = False,
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`distance_matrix`."""
+        if compact:
+            try:
+                result = await self.acall_tool(
+                    "maps_distance_matrix",
+                    self._matrix_args(origins, destinations, mode, compact=True),
+                )
+            except RuntimeError:
+                pass
+            else:
+                if not result.get("isError"):
+                    return result
+        return await self.acall_tool(
+            "maps_distance_matrix",
+            self._matrix_args(origins, destinations, mode),
         )
 
+    @staticmethod
+    def _matrix_args(
+        origins: List[str],
+        destinations: List[str],
+        mode: str,
+        compact: bool = False,
+    ) -> Dict[str, Any]:
+        if compact:
+            return {
+                "origins": "|".join(origins),
+                "destinations": "|".join(destinations),
+                "mode": mode,
+            }
+        return {
+            "origins": origins,
+            "destinations": destinations,
+            "mode": mode,
+        }
+
     def directions(
         self,
         origin: str,
@@ -223,17 +569,84 @@ class MCPClient:
             },
         )
 
-    def elevation(self, locations: List[Tuple[float, float]]) -> Dict[str, Any]:
+    async def adirections(
+        self,
+        origin: str,
+        destination: str,
+        mode: str = "driving",
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`directions`."""
+        return await self.acall_tool(
+            "maps_directions",
+            {
+                "origin": origin,
+                "destination": destination,
+                "mode": mode,
+            },
+        )
+
+    def elevation(self, locations: Iterable[Tuple[float, float]]) -> Dict[str, Any]:
         """
         Get elevation data for locations.
+
+        Pass every point in one call rather than looping per point: locations
+        are sent in batches of up to ``ELEVATION_BATCH_SIZE`` and the batch
+        ``results`` are merged into one payload.
         
         Args:
-            locations: List of (lat, lng) tuples
+            locations: Iterable of (lat, lng) tuples
             
         Returns:
             Elevation data
         """
-        # Convert tuples to list of dicts
-        location_dicts = [{"lat": lat, "lng": lng} for lat, lng in locations]
-        return self.call_tool("maps_elevation", {"locations": location_dicts})
+        results = [
+            self.call_tool("maps_elevation", {"locations": batch})
+            for batch in self._elevation_batches(locations)
+        ]
+        return self._merge_elevation(results)
+
+    async def aelevation(self, locations: Iterable[Tuple[float, float]]) -> Dict[str, Any]:
+        """Async variant of :meth:`elevation`; batches are issued concurrently."""
+        results = await asyncio.gather(
+            *(
+                self.acall_tool("maps_elevation", {"locations": batch})
+                for batch in self._elevation_batches(locations)
+            )
+        )
+        return self._merge_elevation(list(results))
 
+    @staticmethod
+    def _elevation_batches(
+        locations: Iterable[Tuple[float, float]],
+    ) -> Iterator[List[Dict[str, float]]]:
+        """Yield ``{"lat", "lng"}`` dicts in chunks of ``ELEVATION_BATCH_SIZE``."""
+        points = iter(locations)
+        while True:
+            batch = [
+                {"lat": lat, "lng": lng}
+                for lat, lng in itertools.islice(points, ELEVATION_BATCH_SIZE)
+            ]
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def _merge_elevation(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-batch results into one tool result whose text payload holds
+        every batch's ``results``, in order. A batch that failed (``isError``)
+        is returned as-is, like a single failed call.
+        """
+        if len(results) == 1:
+            return results[0]
+        merged: List[Any] = []
+        for result in results:
+            if result.get("isError"):
+                return result
+            try:
+                payload = orjson.loads(tool_text(result))
+            except orjson.JSONDecodeError as exc:
+                raise RuntimeError(f"MCP Error: unexpected elevation payload {result!r}") from exc
+            merged.extend(payload.get("results") or [])
+        text = orjson.dumps({"results": merged}).decode()
+        return {"content": [{"type": "text", "text": text}]}
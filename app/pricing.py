@@ -0,0 +1,125 @@
+"""
+Heuristic price estimate shared by the REST API and the web UI, kept free
+of I/O so it can be called inline from the endpoints (it takes
+microseconds) or tested alone.
+"""
+
+from __future__ import annotations
+
+import functools
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from . import pricing_core
+
+# Base price per m^2 for Zhongshan (illustrative only; not financial advice)
+BASE_PSM_TWD = 280_000.0
+# Growth assumption next 12 months (5%) with light seasonality
+GROWTH_RATE_ANNUAL = 0.05
+
+_MONTH_LABELS = tuple(f"Month {m}" for m in range(1, 13))
+
+_TYPE_ADJ = MappingProxyType({
+    "apartment": 1.0,
+    "condo": 1.05,
+    "house": 1.15,
+    "studio": 0.95,
+})
+
+# Age discount of 0.5% per 5 years, floored at 0.85 (reached at 150 years),
+# tabulated by age so older buildings index the last entry.
+_MAX_AGE = 150
+_AGE_ADJ = tuple(max(0.85, 1.0 - 0.005 * (age // 5)) for age in range(_MAX_AGE + 1))
+
+
+def heuristic_estimate(
+    property_type: Optional[str],
+    sq_meters: Optional[float],
+    bedrooms: Optional[int],
+    bathrooms: Optional[int],
+    year_built: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Heuristic pricing (placeholder until model is integrated).
+
+    Every call returns fresh dicts (nested ones included), so callers may
+    mutate the result without touching the cached entry.
+    """
+
+    cached = _cached_estimate(
+        (property_type or "apartment").lower(),
+        sq_meters or 35.0,
+        bedrooms,
+        bathrooms,
+        year_built,
+    )
+    return {
+        key: dict(value) if isinstance(value, Mapping) else value
+        for key, value in cached.items()
+    }
+
+
+@functools.lru_cache(maxsize=2048)
+def _cached_estimate(
+    property_type: str,
+    size: float,
+    bedrooms: Optional[int],
+    bathrooms: Optional[int],
+    year_built: Optional[int],
+) -> Mapping[str, Any]:
+    # Adjust by property type
+    type_adj = _TYPE_ADJ.get(property_type, 1.0)
+    # Size scaling (smaller units often higher per m^2)
+    size_adj = pricing_core.size_adjustment(size)
+    # Age discount (very rough)
+    age_adj = 1.0
+    if year_built:
+        age = max(0, 2025 - year_built)
+        age_adj = _AGE_ADJ[min(age, _MAX_AGE)]
+
+    current = pricing_core.current_price(
+        BASE_PSM_TWD,
+        type_adj,
+        size,
+        float(bedrooms or 0),
+        float(bathrooms or 0),
+        age_adj,
+    )
+    series = pricing_core.forecast(current, GROWTH_RATE_ANNUAL, pricing_core.SEASONAL)
+    rounded = np.round(series).tolist()
+    monthly = dict(zip(_MONTH_LABELS, rounded))
+    next_year = rounded[-1]
+    ci = {"low": round(next_year * 0.9, 0), "high": round(next_year * 1.1, 0)}
+
+    # The cache entry is shared by every caller, so it is stored read-only;
+    # heuristic_estimate hands out copies.
+    return MappingProxyType({
+        "monthly": MappingProxyType(monthly),
+        "current": current,
+        "next_year": next_year,
+        "ci": MappingProxyType(ci),
+        "assumptions": MappingProxyType({
+            "base_psm_twd": BASE_PSM_TWD,
+            "type_adjustment": type_adj,
+            "size_adjustment": size_adj,
+            "bedrooms": bedrooms,
+            "bathrooms": bathrooms,
+            "age_adjustment": age_adj,
+            "growth_rate_annual": GROWTH_RATE_ANNUAL,
+        }),
+    })
+
+
+def estimate_fields(estimate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Response fields for an estimate, with TWD amounts rounded.
+    """
+
+    return {
+        "monthly_forecast_twd": estimate["monthly"],
+        "current_estimate_twd": round(estimate["current"], 0),
+        "next_year_estimate_twd": round(estimate["next_year"], 0),
+        "ci90_twd": estimate["ci"],
+    }
@@ -0,0 +1,80 @@
+"""
+Numeric core of the heuristic price forecast.
+
+Compiled with numba when it is installed (``pip install numba``); otherwise
+the same functions run as plain NumPy.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import numpy as np
+
+njit: Optional[Any]
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
+
+def _jit(func):
+    if njit is None:
+        return func
+    return njit(cache=True)(func)
+
+
+# Per-month seasonality for the heuristic forecast: light dip in Jan/Feb,
+# summer bump in Jun-Aug.
+SEASONAL = np.array([
+    1.0 + 0.01 * (0.5 if m in (6, 7, 8) else (-0.3 if m in (1, 2) else 0))
+    for m in range(1, 13)
+])
+
+
+@_jit
+def size_adjustment(size: float) -> float:
+    """
+    Smaller units command a higher price per m^2.
+    """
+
+    if size < 25:
+        return 1.1
+    if size < 40:
+        return 1.05
+    if size < 60:
+        return 1.0
+    return 0.95
+
+
+@_jit
+def current_price(
+    base_psm: float,
+    type_adj: float,
+    size: float,
+    bedrooms: float,
+    bathrooms: float,
+    age_adj: float,
+) -> float:
+    """
+    Current price estimate in TWD.
+    """
+
+    bed_adj = 1.0 + 0.02 * bedrooms
+    bath_adj = 1.0 + 0.015 * bathrooms
+    psm = base_psm * type_adj * size_adjustment(size) * bed_adj * bath_adj * age_adj
+    return psm * size
+
+
+@_jit
+def forecast(current: float, growth: float, seasonal: np.ndarray) -> np.ndarray:
+    """
+    Price for each of the next 12 months (unrounded).
+    """
+
+    return current * np.cumprod((1.0 + growth / 12) * seasonal)
+
+
+if njit is not None:
+    # Compile (or load the cached build) at import, not on the first request.
+    forecast(current_price(280_000.0, 1.0, 35.0, 0.0, 0.0, 1.0), 0.05, SEASONAL)
@@ -5,10 +5,23 @@ Uses either a deployed Endpoint (PREDICT) or direct Model.predict.
 
 from __future__ import annotations
 
+import functools
 import os
 from typing import Any, Dict, List, Optional
 
-from google.cloud import aiplatform
+
+@functools.lru_cache(maxsize=None)
+def _aiplatform(project: str, location: str):
+    """
+    Import and initialise the Vertex SDK once per (project, location).
+    The import pulls in grpc/protobuf, so it is deferred until the first
+    prediction instead of taxing every process that imports this module.
+    """
+
+    from google.cloud import aiplatform
+
+    aiplatform.init(project=project, location=location)
+    return aiplatform
 
 
 def vertex_predict(
@@ -33,7 +46,7 @@ def vertex_predict(
     if not project:
         raise RuntimeError("GOOGLE_CLOUD_PROJECT is not set.")
 
-    aiplatform.init(project=project, location=location)
+    aiplatform = _aiplatform(project, location)
 
     if endpoint_id:
         endpoint = aiplatform.Endpoint(endpoint_id=endpoint_id)
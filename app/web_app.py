@@ -4,14 +4,27 @@ Minimal FastAPI web UI for the DeepSeek + Google Maps chatbot.
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional
-
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-
+import asyncio
+import functools
+import gzip
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from . import geocode_cache, mcp_client, pricing
+from .batcher import AsyncBatcher
 from .chatbot_with_maps import MapsEnabledChatbot
+from .maps_models import GeocodeResponse, tool_text
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from .vertex_client import vertex_predict
@@ -20,12 +33,139 @@ from .vertex_client import vertex_predict
 app = FastAPI(
     title="DeepSeek Maps Chatbot",
     description="Chatbot that blends DeepSeek responses with Google Maps MCP tools.",
+    default_response_class=ORJSONResponse,
 )
 
 # Instantiate a single chatbot instance to reuse across requests.
 chatbot = MapsEnabledChatbot()
 
-_recent_predictions: list[dict] = []
+_recent_predictions: deque[dict] = deque(maxlen=5)
+_recent_lock = threading.Lock()
+
+# Shared secret for admin routes (cache invalidation); unset disables them.
+_ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+async def _geocode_batch(addresses: List[str]) -> Sequence[Any]:
+    """
+    Geocode a batch of distinct addresses in one MCP round trip.
+    """
+
+    if len(addresses) == 1:
+        return [await chatbot.ageocode_address(addresses[0])]
+    if not chatbot.maps:
+        raise RuntimeError("MCP client not available")
+    try:
+        return await chatbot.maps.acall_tools_batch(
+            [("maps_geocode", {"address": address}) for address in addresses]
+        )
+    except (RuntimeError, httpx.HTTPError):
+        # The server rejected the batch as a whole (a JSON-RPC error object,
+        # or an HTTP 4xx for the array): look the addresses up one by one, so
+        # one bad address only fails its own callers.
+        return await asyncio.gather(
+            *(chatbot.ageocode_address(address) for address in addresses),
+            return_exceptions=True,
+        )
+
+
+# vertex_predict is a blocking SDK call: run it on a dedicated, bounded pool
+# (so it can't starve asyncio's default executor) and give up after a short
+# timeout, falling back to the heuristic.
+_VERTEX_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="vertex")
+VERTEX_TIMEOUT_SECONDS = 2.0
+
+
+async def _vertex_batch(instances: List[Dict[str, Any]]) -> Sequence[Any]:
+    """
+    Score a batch of instances with one Vertex AI request.
+    """
+
+    out = await asyncio.get_running_loop().run_in_executor(
+        _VERTEX_POOL,
+        functools.partial(vertex_predict, instances, parameters={"horizon_months": 12}),
+    )
+    return out.get("predictions") or []
+
+
+# Vertex cost is dominated by per-request overhead, so predictions arriving
+# within 20 ms share one call (up to 16 instances).
+VERTEX_BATCHER: AsyncBatcher[Dict[str, Any], Dict[str, Any]] = AsyncBatcher(
+    _vertex_batch,
+    max_batch=16,
+    flush_ms=20.0,
+)
+
+# Nearby POIs barely change within a ~100 m cell (3 decimal places), so
+# nearby searches are reused per cell for a few minutes. Only touched from
+# the event loop, so no thread lock is needed.
+NEARBY_TTL_SECONDS = 5 * 60
+_NEARBY_RADIUS = 1000
+_NEARBY_KEYWORD = "mall"
+
+_nearby_cache: TTLCache = TTLCache(maxsize=4096, ttl=NEARBY_TTL_SECONDS)
+_nearby_locks: Dict[Tuple[Any, ...], asyncio.Lock] = {}
+
+
+async def _cached_nearby(lat: float, lng: float) -> Optional[Dict[str, Any]]:
+    """
+    Nearby mall search for a location, cached per rounded lat/lng cell.
+    None when the MCP client is not available.
+    """
+
+    maps = chatbot.maps
+    if maps is None:
+        return None
+    key = (round(lat, 3), round(lng, 3), _NEARBY_RADIUS, _NEARBY_KEYWORD)
+    nearby = _nearby_cache.get(key)
+    if nearby is not None:
+        return nearby
+
+    # Single-flight: concurrent misses on a cold cell wait for one search.
+    # Only the caller that created the lock removes it, so a waiter can't
+    # evict a newer lock registered after a failed search.
+    new_lock = asyncio.Lock()
+    lock = _nearby_locks.setdefault(key, new_lock)
+    owner = lock is new_lock
+    try:
+        async with lock:
+            nearby = _nearby_cache.get(key)
+            if nearby is None:
+                nearby = await maps.asearch_nearby(
+                    location=f"{lat},{lng}",
+                    radius=_NEARBY_RADIUS,
+                    keyword=_NEARBY_KEYWORD,
+                )
+                # Tool errors are transient; let the next request retry.
+                if not nearby.get("isError"):
+                    _nearby_cache[key] = nearby
+    finally:
+        if owner and _nearby_locks.get(key) is lock:
+            del _nearby_locks[key]
+    return nearby
+
+
+# Concurrent predictions within a 10 ms window share one upstream geocode
+# call, and identical (normalized) addresses are looked up only once.
+GEOCODE_BATCHER: AsyncBatcher[str, Dict[str, Any]] = AsyncBatcher(
+    _geocode_batch,
+    max_batch=32,
+    flush_ms=10.0,
+    key=geocode_cache.normalize_address,
+)
+
+
+@app.on_event("shutdown")
+async def _close_clients() -> None:
+    """
+    Release pooled connections and background workers on shutdown.
+    Everything here is rebuilt lazily, so the app can be started again.
+    """
+
+    await GEOCODE_BATCHER.aclose()
+    await VERTEX_BATCHER.aclose()
+    await chatbot.aclose()
+
 
 # CORS for integrating external frontends (e.g., Lovable)
 # For production, replace '*' with your exact Lovable domain(s), e.g.:
@@ -60,6 +200,18 @@ class PredictRequest(BaseModel):
     year_built: Optional[int] = None
     use_maps: bool = True
 
+class Assumptions(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    base_psm_twd: float
+    type_adjustment: float
+    size_adjustment: float
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    age_adjustment: float
+    growth_rate_annual: float
+
+
 class PredictResponse(BaseModel):
     normalized_address: str
     lat: float
@@ -68,27 +220,13 @@ class PredictResponse(BaseModel):
     current_estimate_twd: float
     next_year_estimate_twd: float
     ci90_twd: Dict[str, float]
-    assumptions: Dict[str, Any]
+    assumptions: Assumptions
     nearby_context: Optional[Dict[str, Any]] = None
     recent: list[dict]
 
 
-@app.get("/health")
-async def health() -> Dict[str, str]:
-    """
-    Simple health check endpoint.
-    """
-
-    return {"status": "ok"}
-
-
-@app.get("/", response_class=HTMLResponse)
-async def index() -> str:
-    """
-    Serve a minimal HTML interface for chatting.
-    """
-
-    return """
+# The UI page is static: encode it once at import instead of per request.
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -334,26 +472,66 @@ async def index() -> str:
       };
       pStatus.textContent = 'Estimating...';
       try {
-        const res = await fetch('/api/predict', {
+        // EventSource can't POST, so read the SSE stream from fetch directly.
+        const res = await fetch('/api/predict/stream', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify(payload),
         });
         if (!res.ok) throw new Error('Request failed: ' + res.status);
-        const data = await res.json();
-        renderChart(data.monthly_forecast_twd);
-        renderRecent(data.recent);
-        summary.innerHTML = '<h4>Summary</h4>' +
-          '<div><strong>Address:</strong> ' + data.normalized_address + '</div>' +
-          '<div><strong>Current estimate:</strong> ' + data.current_estimate_twd.toLocaleString() + ' TWD</div>' +
-          '<div><strong>Next-year estimate:</strong> ' + data.next_year_estimate_twd.toLocaleString() + ' TWD</div>' +
-          '<div class="muted">Assumptions: ' + JSON.stringify(data.assumptions) + '</div>';
-        pStatus.textContent = 'Done.';
+        let data = {};
+        await readEvents(res, (event, part) => {
+          if (event === 'heuristic') {
+            data = part;
+            renderPrediction(data);
+            pStatus.textContent = 'Refining...';
+          } else if (event === 'vertex') {
+            Object.assign(data, part);
+            renderPrediction(data);
+          } else if (event === 'nearby') {
+            data.nearby_context = part.nearby_context;
+          } else if (event === 'done') {
+            renderRecent(part.recent);
+            pStatus.textContent = 'Done.';
+          }
+        });
       } catch (e) {
         pStatus.textContent = 'Error: ' + e.message;
       }
     }
 
+    function renderPrediction(data) {
+      renderChart(data.monthly_forecast_twd);
+      summary.innerHTML = '<h4>Summary</h4>' +
+        '<div><strong>Address:</strong> ' + data.normalized_address + '</div>' +
+        '<div><strong>Current estimate:</strong> ' + data.current_estimate_twd.toLocaleString() + ' TWD</div>' +
+        '<div><strong>Next-year estimate:</strong> ' + data.next_year_estimate_twd.toLocaleString() + ' TWD</div>' +
+        '<div class="muted">Assumptions: ' + JSON.stringify(data.assumptions) + '</div>';
+    }
+
+    async function readEvents(res, onEvent) {
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buf = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+        let idx;
+        while ((idx = buf.indexOf('\\n\\n')) >= 0) {
+          const block = buf.slice(0, idx);
+          buf = buf.slice(idx + 2);
+          let event = 'message';
+          let payload = '';
+          for (const line of block.split('\\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) payload += line.slice(6);
+          }
+          onEvent(event, payload ? JSON.parse(payload) : {});
+        }
+      }
+    }
+
     predictBtn.addEventListener('click', predict);
     clearBtn.addEventListener('click', () => {
       bName.value = ''; addr.value = ''; sqm.value=''; beds.value=''; baths.value=''; yBuilt.value='';
@@ -362,7 +540,110 @@ async def index() -> str:
   </script>
 </body>
 </html>
+"""
+
+
+def _minify_html(html: str) -> str:
+    """
+    Drop indentation and blank lines. Line breaks are kept so inline JS
+    still parses without relying on explicit semicolons.
+    """
+
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def _etag(body: bytes, suffix: str = "") -> str:
+    """
+    Strong ETag for a static body (distinct per content encoding).
+    """
+
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + suffix + '"'
+
+
+def _not_modified(request: Request, etag: str, headers: Dict[str, str]) -> Optional[Response]:
+    """
+    A 304 response if the client already holds this representation.
+    If-None-Match uses weak comparison, so a tag a proxy weakened to
+    W/"..." (nginx does this when it gzips) still matches.
+    """
+
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+_INDEX_HTML_BYTES = _minify_html(_INDEX_HTML).encode("utf-8")
+# mtime=0 keeps the compressed bytes (and their ETag) identical across restarts.
+_INDEX_HTML_GZ = gzip.compress(_INDEX_HTML_BYTES, compresslevel=9, mtime=0)
+_INDEX_HEADERS = {
+    "Cache-Control": "public, max-age=300",
+    "Vary": "Accept-Encoding",
+    "ETag": _etag(_INDEX_HTML_BYTES),
+}
+_INDEX_GZ_HEADERS = {
+    **_INDEX_HEADERS,
+    "Content-Encoding": "gzip",
+    "ETag": _etag(_INDEX_HTML_BYTES, "-gzip"),
+}
+
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
+# no-cache: pollers always revalidate, but a match costs an empty 304.
+_HEALTH_HEADERS = {"Cache-Control": "no-cache", "ETag": _etag(_HEALTH_BYTES)}
+
+
+@app.get("/health")
+async def health(request: Request) -> Response:
+    """
+    Simple health check endpoint.
+    """
+
+    return _not_modified(request, _HEALTH_HEADERS["ETag"], _HEALTH_HEADERS) or Response(
+        content=_HEALTH_BYTES,
+        media_type="application/json",
+        headers=_HEALTH_HEADERS,
+    )
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request) -> Response:
+    """
+    Serve a minimal HTML interface for chatting.
+    """
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body, headers = _INDEX_HTML_GZ, _INDEX_GZ_HEADERS
+    else:
+        body, headers = _INDEX_HTML_BYTES, _INDEX_HEADERS
+    return _not_modified(request, headers["ETag"], headers) or Response(
+        content=body,
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
+
+
+@app.delete("/api/geocode-cache")
+async def clear_geocode_cache(request: Request) -> Dict[str, bool]:
     """
+    Drop cached geocodes, e.g. after correcting an address upstream.
+    Requires the X-Admin-Token header to match ADMIN_TOKEN; without
+    ADMIN_TOKEN set the route is disabled.
+    """
+
+    if not _ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), _ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+    # The MCP client caches geocodes too; clear both so the next lookup
+    # really goes upstream.
+    geocode_cache.clear()
+    mcp_client.clear_lookup_cache()
+    return {"cleared": True}
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -396,145 +677,213 @@ async def predict_endpoint(request: PredictRequest) -> PredictResponse:
     - Returns a recent-history list for UX continuity.
     """
 
+    normalized, lat, lng = await _geocode(request)
+
+    # Nearby context only needs lat/lng: start it now so it overlaps with
+    # the heuristic and the Vertex call, and collect it at the end.
+    nearby_task = _start_nearby(lat, lng)
+
+    estimate = _heuristic_estimate(request)
+    refined = await _vertex_estimate(request, normalized, lat, lng)
+    if refined:
+        estimate.update(refined)
+
+    nearby_ctx = await _collect_nearby(nearby_task)
+    recent_snapshot = _remember(normalized, estimate)
+
+    return PredictResponse(
+        normalized_address=normalized,
+        lat=lat,
+        lng=lng,
+        **pricing.estimate_fields(estimate),
+        assumptions=estimate["assumptions"],
+        nearby_context=nearby_ctx,
+        recent=recent_snapshot,
+    )
+
+
+@app.post("/api/predict/stream")
+async def predict_stream_endpoint(request: PredictRequest) -> StreamingResponse:
+    """
+    Streaming variant of /api/predict (Server-Sent Events).
+    - `event: heuristic` as soon as the heuristic forecast is ready
+    - `event: vertex` with refined estimates, if Vertex AI is configured and answers
+    - `event: nearby` with the nearby context
+    - `event: done` with the recent-history list
+    Geocoding errors are returned as regular HTTP errors before the stream starts.
+    """
+
+    normalized, lat, lng = await _geocode(request)
+
+    async def events() -> AsyncIterator[bytes]:
+        # Started inside the generator so a client that disconnects before the
+        # first read never leaves an orphaned task behind; it still overlaps
+        # with the heuristic and Vertex steps below.
+        nearby_task = _start_nearby(lat, lng)
+        try:
+            estimate = _heuristic_estimate(request)
+            yield _sse("heuristic", {
+                "normalized_address": normalized,
+                "lat": lat,
+                "lng": lng,
+                **pricing.estimate_fields(estimate),
+                "assumptions": estimate["assumptions"],
+            })
+
+            refined = await _vertex_estimate(request, normalized, lat, lng)
+            if refined:
+                estimate.update(refined)
+                yield _sse("vertex", pricing.estimate_fields(estimate))
+
+            nearby_ctx = await _collect_nearby(nearby_task)
+            yield _sse("nearby", {"nearby_context": nearby_ctx})
+
+            yield _sse("done", {"recent": _remember(normalized, estimate)})
+        finally:
+            # Client went away mid-stream: don't leave the search running.
+            if nearby_task is not None:
+                nearby_task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    """
+    Encode one Server-Sent Event.
+    """
+
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _geocode(request: PredictRequest) -> Tuple[str, float, float]:
+    """
+    Geocode the request address: (normalized address, lat, lng).
+    """
+
     addr = request.address.strip()
     if not addr:
         raise HTTPException(status_code=422, detail="Address is required.")
 
-    # 1) Geocode address via MCP
-    try:
-        geo = chatbot.geocode_address(addr)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Geocoding failed: {exc}") from exc
-
-    content = geo.get("content")
-    text_blob = ""
-    if isinstance(content, list) and content:
-        text_blob = content[0].get("text", "")
-    elif isinstance(content, str):
-        text_blob = content
+    # Geocode address via MCP (cached per normalized address)
+    cached = geocode_cache.get(addr)
+    geo = cached
+    if geo is None:
+        try:
+            geo = await GEOCODE_BATCHER.submit(addr)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Geocoding failed: {exc}") from exc
+
+    text_blob = tool_text(geo)
     if not text_blob:
         raise HTTPException(status_code=404, detail="No geocoding results.")
 
     try:
-        data = json.loads(text_blob)
-    except json.JSONDecodeError as exc:
+        parsed = GeocodeResponse.model_validate_json(text_blob)
+    except ValidationError as exc:
         raise HTTPException(status_code=500, detail="Bad geocode payload.") from exc
-    results = data.get("results") or []
-    if not results:
+    if not parsed.results:
         raise HTTPException(status_code=404, detail="Address not found.")
-    top = results[0]
-    normalized = top.get("formatted_address") or addr
-    geometry = top.get("geometry") or {}
-    loc = geometry.get("location") or {}
-    lat = float(loc.get("lat", 0.0))
-    lng = float(loc.get("lng", 0.0))
-
-    # 2) Heuristic pricing (placeholder until model is integrated)
-    # Base price per m^2 for Zhongshan (illustrative only; not financial advice)
-    base_psm = 280_000.0
-    # Adjust by property type
-    type_adj = {
-        "apartment": 1.0,
-        "condo": 1.05,
-        "house": 1.15,
-        "studio": 0.95,
-    }.get((request.property_type or "apartment").lower(), 1.0)
-    # Size scaling (smaller units often higher per m^2)
-    size = request.sq_meters or 35.0
-    size_adj = 1.1 if size < 25 else (1.05 if size < 40 else (1.0 if size < 60 else 0.95))
-    # Bedroom/bathroom small adders
-    bed_adj = 1.0 + 0.02 * (request.bedrooms or 0)
-    bath_adj = 1.0 + 0.015 * (request.bathrooms or 0)
-    # Age discount (very rough)
-    age_adj = 1.0
-    if request.year_built:
-        age = max(0, 2025 - request.year_built)
-        age_adj = max(0.85, 1.0 - 0.005 * (age // 5))
-
-    psm = base_psm * type_adj * size_adj * bed_adj * bath_adj * age_adj
-    current = psm * size
-    # Growth assumption next 12 months (5%) with light seasonality
-    growth = 0.05
-    monthly = {}
-    running = current
-    for m in range(1, 13):
-        seasonal = 1.0 + 0.01 * (0.5 if m in (6,7,8) else (-0.3 if m in (1,2) else 0))
-        running = running * (1.0 + growth/12) * seasonal
-        monthly[f"Month {m}"] = round(running, 0)
-    next_year = list(monthly.values())[-1] if monthly else current
-    ci = {"low": round(next_year * 0.9, 0), "high": round(next_year * 1.1, 0)}
-
-    # Try Vertex AI if configured
+    # Only cache geocodes that parsed to at least one result.
+    if cached is None:
+        geocode_cache.put(addr, geo)
+    top = parsed.results[0]
+    normalized = top.formatted_address or addr
+    return normalized, top.geometry.location.lat, top.geometry.location.lng
+
+
+def _heuristic_estimate(request: PredictRequest) -> Dict[str, Any]:
+    return pricing.heuristic_estimate(
+        request.property_type,
+        request.sq_meters,
+        request.bedrooms,
+        request.bathrooms,
+        request.year_built,
+    )
+
+
+async def _vertex_estimate(
+    request: PredictRequest, normalized: str, lat: float, lng: float
+) -> Optional[Dict[str, Any]]:
+    """
+    Vertex AI estimate overriding the heuristic, or None if not configured,
+    failed, or returned an unexpected shape.
+    """
+
+    if not (os.getenv("VERTEX_ENDPOINT_ID") or os.getenv("VERTEX_MODEL_NAME")):
+        return None
     try:
-        if os.getenv("VERTEX_ENDPOINT_ID") or os.getenv("VERTEX_MODEL_NAME"):
-            instances = [{
-                "address": normalized,
-                "district": "Zhongshan",
-                "city": "Taipei",
-                "country": "Taiwan",
-                "lat": lat,
-                "lng": lng,
-                "sq_meters": size,
-                "bedrooms": request.bedrooms or 0,
-                "bathrooms": request.bathrooms or 0,
-                "property_type": (request.property_type or "apartment"),
-                "year_built": request.year_built or 0,
-            }]
-            out = vertex_predict(instances, parameters={"horizon_months": 12})
-            # Expecting model to return either a series or point estimate(s).
-            preds = out.get("predictions") or []
-            if preds:
-                p = preds[0]
-                # Flexible mapping: accept either keys or fallback to heuristic ones.
-                monthly_v = p.get("monthly_forecast_twd")
-                current_v = p.get("current_estimate_twd")
-                next_year_v = p.get("next_year_estimate_twd")
-                if isinstance(monthly_v, dict) and current_v and next_year_v:
-                    monthly = {k: float(v) for k, v in monthly_v.items()}
-                    current = float(current_v)
-                    next_year = float(next_year_v)
-                    ci = {
-                        "low": float(p.get("ci90_low_twd", next_year * 0.9)),
-                        "high": float(p.get("ci90_high_twd", next_year * 1.1)),
-                    }
+        instance = {
+            "address": normalized,
+            "district": "Zhongshan",
+            "city": "Taipei",
+            "country": "Taiwan",
+            "lat": lat,
+            "lng": lng,
+            "sq_meters": request.sq_meters or 35.0,
+            "bedrooms": request.bedrooms or 0,
+            "bathrooms": request.bathrooms or 0,
+            "property_type": (request.property_type or "apartment"),
+            "year_built": request.year_built or 0,
+        }
+        # Expecting model to return either a series or point estimate(s).
+        p = await asyncio.wait_for(
+            VERTEX_BATCHER.submit(instance), timeout=VERTEX_TIMEOUT_SECONDS
+        )
+        # Flexible mapping: accept either keys or fallback to heuristic ones.
+        monthly_v = p.get("monthly_forecast_twd")
+        current_v = p.get("current_estimate_twd")
+        next_year_v = p.get("next_year_estimate_twd")
+        if isinstance(monthly_v, dict) and current_v and next_year_v:
+            next_year = float(next_year_v)
+            return {
+                "monthly": {k: float(v) for k, v in monthly_v.items()},
+                "current": float(current_v),
+                "next_year": next_year,
+                "ci": {
+                    "low": float(p.get("ci90_low_twd", next_year * 0.9)),
+                    "high": float(p.get("ci90_high_twd", next_year * 1.1)),
+                },
+            }
     except Exception:
         # Silent fallback to heuristic if Vertex fails
         pass
+    return None
+
+
+def _start_nearby(lat: float, lng: float) -> Optional[asyncio.Task]:
+    if not chatbot.maps:
+        return None
+    return asyncio.create_task(_cached_nearby(lat, lng))
+
+
+async def _collect_nearby(nearby_task: Optional[asyncio.Task]) -> Optional[Dict[str, Any]]:
+    """
+    Nearby context (optional): a couple of POIs for color.
+    """
 
-    # 3) Nearby context (optional): fetch a couple of POIs for color
-    nearby_ctx = None
     try:
-        nearby = chatbot.maps.search_nearby(location=f"{lat},{lng}", radius=1000, keyword="mall") if chatbot.maps else None
-        nearby_ctx = {"raw": nearby}
+        nearby = await nearby_task if nearby_task else None
+        return {"raw": nearby}
     except Exception:
-        nearby_ctx = None
+        return None
+
+
+def _remember(normalized: str, estimate: Dict[str, Any]) -> list[dict]:
+    """
+    Record a prediction in the recent history and return a snapshot.
+    """
 
     record = {
         "normalized_address": normalized,
-        "current_estimate_twd": round(current, 0),
-        "next_year_estimate_twd": round(next_year, 0),
+        "current_estimate_twd": round(estimate["current"], 0),
+        "next_year_estimate_twd": round(estimate["next_year"], 0),
     }
-    _recent_predictions.insert(0, record)
-    _recent_predictions[:] = _recent_predictions[:5]
-
-    return PredictResponse(
-        normalized_address=normalized,
-        lat=lat,
-        lng=lng,
-        monthly_forecast_twd=monthly,
-        current_estimate_twd=round(current, 0),
-        next_year_estimate_twd=round(next_year, 0),
-        ci90_twd=ci,
-        assumptions={
-            "base_psm_twd": base_psm,
-            "type_adjustment": type_adj,
-            "size_adjustment": size_adj,
-            "bedrooms": request.bedrooms,
-            "bathrooms": request.bathrooms,
-            "age_adjustment": age_adj,
-            "growth_rate_annual": growth,
-        },
-        nearby_context=nearby_ctx,
-        recent=_recent_predictions,
-    )
-
+    # appendleft is O(1) and evicts past maxlen; the lock makes the update
+    # and the snapshot we return one atomic step.
+    with _recent_lock:
+        _recent_predictions.appendleft(record)
+        return list(_recent_predictions)
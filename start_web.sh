@@ -36,5 +36,6 @@ if ! $PYTHON_CMD -m uvicorn --help &> /dev/null; then
 fi
 
 # Start the API server (no web UI - pure backend)
-$PYTHON_CMD -m uvicorn app.api:app --reload --port 8000 --host 0.0.0.0
+# uvloop + httptools come with uvicorn[standard] (see requirements.txt)
+$PYTHON_CMD -m uvicorn app.api:app --reload --port 8000 --host 0.0.0.0 --loop uvloop --http httptools
 
@@ -0,0 +1,61 @@
+"""
+/api/predict single-flight: identical concurrent requests share one computation.
+"""
+
+import asyncio
+
+import orjson
+
+from app import api
+
+
+def test_identical_requests_share_one_computation(monkeypatch):
+    calls = []
+
+    async def fake_predict(request, addr):
+        calls.append(addr)
+        await asyncio.sleep(0.05)
+        return {"normalized_address": addr, "sq_meters": request.sq_meters}
+
+    monkeypatch.setattr(api, "_predict", fake_predict)
+
+    async def scenario():
+        same = [api.PredictRequest(address=a, sq_meters=40) for a in ("Main St", " main  st ", "MAIN ST")]
+        other = api.PredictRequest(address="Main St", sq_meters=41)
+        responses = await asyncio.gather(*(api.predict_endpoint(r) for r in same + [other]))
+        return [orjson.loads(r.body) for r in responses]
+
+    bodies = asyncio.run(scenario())
+
+    # One computation for the three spellings of the same request, one for
+    # the request with different inputs.
+    assert len(calls) == 2
+    assert bodies[0] == bodies[1] == bodies[2]
+    assert bodies[3] != bodies[0]
+    assert api._inflight == {}
+
+
+def test_failure_is_shared_and_not_remembered(monkeypatch):
+    calls = []
+
+    async def failing_predict(request, addr):
+        calls.append(addr)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(api, "_predict", failing_predict)
+
+    async def scenario():
+        request = api.PredictRequest(address="Broken Rd")
+        first = await asyncio.gather(
+            api.predict_endpoint(request), api.predict_endpoint(request), return_exceptions=True
+        )
+        second = await asyncio.gather(api.predict_endpoint(request), return_exceptions=True)
+        return first + second
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # The two concurrent calls shared one attempt; the later call retried.
+    assert len(calls) == 2
+    assert api._inflight == {}
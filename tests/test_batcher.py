@@ -0,0 +1,126 @@
+"""
+AsyncBatcher: size/timeout flushing, dedupe, error fan-out and shutdown.
+"""
+
+import asyncio
+
+import pytest
+
+from app.batcher import AsyncBatcher
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [item * 10 for item in items]
+
+
+def test_flushes_when_batch_is_full():
+    async def scenario():
+        handler = Recorder()
+        # A long window: only max_batch can trigger the first flushes.
+        batcher = AsyncBatcher(handler, max_batch=3, flush_ms=200.0)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        await batcher.aclose()
+        return handler.batches, results
+
+    batches, results = asyncio.run(scenario())
+
+    assert results == [i * 10 for i in range(7)]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_flushes_after_the_window():
+    async def scenario():
+        handler = Recorder()
+        batcher = AsyncBatcher(handler, max_batch=100, flush_ms=20.0)
+        first = asyncio.gather(batcher.submit(1), batcher.submit(2))
+        await asyncio.sleep(0.1)
+        second = await batcher.submit(3)
+        await batcher.aclose()
+        return handler.batches, await first, second
+
+    batches, first, second = asyncio.run(scenario())
+
+    assert batches == [[1, 2], [3]]
+    assert first == [10, 20]
+    assert second == 30
+
+
+def test_dedupes_by_key():
+    async def scenario():
+        handler = Recorder()
+        batcher = AsyncBatcher(handler, max_batch=10, flush_ms=10.0, key=lambda item: item % 2)
+        results = await asyncio.gather(*(batcher.submit(i) for i in (1, 3, 2)))
+        await batcher.aclose()
+        return handler.batches, results
+
+    batches, results = asyncio.run(scenario())
+
+    assert batches == [[1, 2]]
+    assert results == [10, 10, 20]
+
+
+def test_length_mismatch_fails_every_caller():
+    async def short(items):
+        return items[:-1]
+
+    async def scenario():
+        batcher = AsyncBatcher(short, max_batch=10, flush_ms=10.0)
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(3)), return_exceptions=True
+        )
+        await batcher.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert "2 results for 3 items" in str(results[0])
+
+
+def test_per_item_exception_fails_only_that_caller():
+    async def handler(items):
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    async def scenario():
+        batcher = AsyncBatcher(handler, max_batch=10, flush_ms=10.0)
+        results = await asyncio.gather(
+            batcher.submit("ok"), batcher.submit("bad"), return_exceptions=True
+        )
+        await batcher.aclose()
+        return results
+
+    ok, bad = asyncio.run(scenario())
+
+    assert ok == "OK"
+    assert isinstance(bad, ValueError)
+
+
+@pytest.mark.parametrize("flush_ms, wait", [(5000.0, 0.01), (1.0, 0.05)])
+def test_aclose_fails_pending_callers(flush_ms, wait):
+    # (collecting a batch) and (dispatching one batch, others still queued)
+    async def scenario():
+        batcher = AsyncBatcher(Recorder(delay=10.0), max_batch=2, flush_ms=flush_ms)
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(5)]
+        await asyncio.sleep(wait)
+        await batcher.aclose()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1.0)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_reusable_across_event_loops():
+    handler = Recorder()
+    batcher = AsyncBatcher(handler, max_batch=10, flush_ms=1.0)
+
+    assert asyncio.run(batcher.submit(1)) == 10
+    assert asyncio.run(batcher.submit(2)) == 20
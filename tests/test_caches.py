@@ -0,0 +1,65 @@
+"""
+geocode_cache and llm_cache policies.
+"""
+
+import pytest
+
+from app import geocode_cache, llm_cache
+
+GEO = {"content": [{"type": "text", "text": '{"results": []}'}]}
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    geocode_cache.clear()
+    llm_cache.clear()
+    yield
+    geocode_cache.clear()
+    llm_cache.clear()
+
+
+def test_geocode_cache_normalizes_addresses():
+    geocode_cache.put("  Taipei   101 ", GEO)
+
+    assert geocode_cache.normalize_address("  Taipei   101 ") == "taipei 101"
+    assert geocode_cache.get("TAIPEI 101") == GEO
+
+
+@pytest.mark.parametrize("result", [
+    {},
+    {"content": []},
+    {"isError": True, "content": [{"type": "text", "text": "Error: OVER_QUERY_LIMIT"}]},
+])
+def test_geocode_cache_skips_empty_and_error_results(result):
+    geocode_cache.put("Somewhere", result)
+
+    assert geocode_cache.get("Somewhere") is None
+
+
+def test_geocode_cache_clear():
+    geocode_cache.put("Somewhere", GEO)
+    geocode_cache.clear()
+
+    assert geocode_cache.get("Somewhere") is None
+
+
+@pytest.mark.parametrize("temperature, cacheable", [(0, True), (0.0, True), (None, False), (0.7, False)])
+def test_llm_cache_only_explicit_temperature_zero(temperature, cacheable):
+    assert llm_cache.is_cacheable(temperature) is cacheable
+
+
+def test_llm_cache_key_covers_every_input():
+    base = dict(system_prompt="s", prompt="p", use_maps=True, model="m", temperature=0, max_tokens=None)
+    key = llm_cache.make_key(**base)
+
+    assert llm_cache.make_key(**base) == key
+    for field, value in [("system_prompt", "s2"), ("prompt", "p2"), ("use_maps", False),
+                         ("model", "m2"), ("max_tokens", 10)]:
+        assert llm_cache.make_key(**{**base, field: value}) != key
+
+
+def test_llm_cache_roundtrip():
+    llm_cache.put("k", "answer", {"total_tokens": 3})
+
+    assert llm_cache.get("k") == ("answer", {"total_tokens": 3})
+    assert llm_cache.get("missing") is None
@@ -0,0 +1,117 @@
+"""
+The pricing module must reproduce the original inline /api/predict heuristic.
+"""
+
+import pytest
+
+from app import pricing
+
+
+def _inline_estimate(property_type, sq_meters, bedrooms, bathrooms, year_built):
+    # The heuristic as it was written inline in api.predict_endpoint.
+    base_psm = 280_000.0
+    type_adj = {
+        "apartment": 1.0,
+        "condo": 1.05,
+        "house": 1.15,
+        "studio": 0.95,
+    }.get((property_type or "apartment").lower(), 1.0)
+    size = sq_meters or 35.0
+    size_adj = 1.1 if size < 25 else (1.05 if size < 40 else (1.0 if size < 60 else 0.95))
+    bed_adj = 1.0 + 0.02 * (bedrooms or 0)
+    bath_adj = 1.0 + 0.015 * (bathrooms or 0)
+    age_adj = 1.0
+    if year_built:
+        age = max(0, 2025 - year_built)
+        age_adj = max(0.85, 1.0 - 0.005 * (age // 5))
+
+    psm = base_psm * type_adj * size_adj * bed_adj * bath_adj * age_adj
+    current = psm * size
+    growth = 0.05
+    monthly = {}
+    running = current
+    for m in range(1, 13):
+        seasonal = 1.0 + 0.01 * (0.5 if m in (6, 7, 8) else (-0.3 if m in (1, 2) else 0))
+        running = running * (1.0 + growth / 12) * seasonal
+        monthly[f"Month {m}"] = round(running, 0)
+    next_year = list(monthly.values())[-1]
+    ci = {"low": round(next_year * 0.9, 0), "high": round(next_year * 1.1, 0)}
+    return {
+        "monthly": monthly,
+        "current": current,
+        "next_year": next_year,
+        "ci": ci,
+        "assumptions": {
+            "base_psm_twd": base_psm,
+            "type_adjustment": type_adj,
+            "size_adjustment": size_adj,
+            "bedrooms": bedrooms,
+            "bathrooms": bathrooms,
+            "age_adjustment": age_adj,
+            "growth_rate_annual": growth,
+        },
+    }
+
+
+CASES = [
+    (None, None, None, None, None),
+    ("apartment", 20, 1, 1, 2020),
+    ("Condo", 39.5, 2, 1, 1995),
+    ("house", 55, 3, 2, 1960),
+    ("studio", 80, 0, 0, 1800),
+    ("castle", 35, None, None, 2030),
+]
+
+
+@pytest.mark.parametrize("args", CASES)
+def test_matches_inline_formula(args):
+    expected = _inline_estimate(*args)
+    actual = pricing.heuristic_estimate(*args)
+
+    assert actual["current"] == pytest.approx(expected["current"], rel=1e-12)
+    assert list(actual["monthly"]) == list(expected["monthly"])
+    # np.cumprod vs. the running product may differ in the last ulp, which
+    # can move a .5 rounding by one TWD.
+    for label, value in expected["monthly"].items():
+        assert actual["monthly"][label] == pytest.approx(value, abs=1)
+    assert actual["next_year"] == pytest.approx(expected["next_year"], abs=1)
+    assert actual["ci"]["low"] == pytest.approx(expected["ci"]["low"], abs=1)
+    assert actual["ci"]["high"] == pytest.approx(expected["ci"]["high"], abs=1)
+    assert actual["assumptions"] == pytest.approx(expected["assumptions"])
+
+
+def test_next_year_is_last_month():
+    estimate = pricing.heuristic_estimate("apartment", 35, 1, 1, 2000)
+
+    assert estimate["next_year"] == estimate["monthly"]["Month 12"]
+
+
+def test_callers_cannot_corrupt_the_cache():
+    first = pricing.heuristic_estimate("condo", 30, 1, 1, 2000)
+    first["monthly"]["Month 1"] = -1.0
+    first["ci"]["low"] = -1.0
+    first["assumptions"]["bedrooms"] = 99
+    first["current"] = -1.0
+
+    second = pricing.heuristic_estimate("condo", 30, 1, 1, 2000)
+
+    assert second["monthly"]["Month 1"] > 0
+    assert second["ci"]["low"] > 0
+    assert second["assumptions"]["bedrooms"] == 1
+    assert second["current"] > 0
+
+
+def test_estimate_fields_rounds_amounts():
+    fields = pricing.estimate_fields({
+        "monthly": {"Month 1": 1.0},
+        "current": 1234.6,
+        "next_year": 99.4,
+        "ci": {"low": 1.0, "high": 2.0},
+    })
+
+    assert fields == {
+        "monthly_forecast_twd": {"Month 1": 1.0},
+        "current_estimate_twd": 1235.0,
+        "next_year_estimate_twd": 99.0,
+        "ci90_twd": {"low": 1.0, "high": 2.0},
+    }